@@ -11,16 +11,28 @@ Date: January 2026
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
-from sklearn.cluster import KMeans
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.preprocessing import StandardScaler
 import random
+import re
 from collections import defaultdict
 import io
+import sys
+import hashlib
+from html import escape
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from types import MappingProxyType
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from learner_kernels import classify_kernel, learner_means_kernel
 
 # ==================== PAGE CONFIGURATION ====================
 st.set_page_config(
@@ -31,8 +43,7 @@ st.set_page_config(
 )
 
 # ==================== CUSTOM CSS STYLING ====================
-st.markdown("""
-<style>
+_CSS = """
     @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@700&family=Source+Sans+3:wght@300;400;600&display=swap');
     
     .main {
@@ -85,6 +96,23 @@ st.markdown("""
         margin: 10px 0;
     }
     
+    .success-chip, .warning-chip {
+        padding: 12px 16px;
+        border-radius: 8px;
+        margin: 8px 0;
+        font-family: 'Source Sans 3', sans-serif;
+    }
+    
+    .success-chip {
+        background: rgba(33, 195, 84, 0.1);
+        color: #177233;
+    }
+    
+    .warning-chip {
+        background: rgba(255, 189, 69, 0.2);
+        color: #926c05;
+    }
+    
     .challenge-badge {
         background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
         color: white;
@@ -137,32 +165,138 @@ st.markdown("""
         border: 2px dashed #667eea;
         margin: 20px 0;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _get_css():
+    """Return the app stylesheet, whitespace-collapsed and wrapped in a <style> tag, built once per server process"""
+    return "<style>" + re.sub(r"\s+", " ", _CSS).strip() + "</style>"
+
+def _inject_css():
+    """Emit the app stylesheet; fragment reruns keep it, full reruns must send it again"""
+    # Streamlit drops elements a full rerun does not re-emit, so a run-once guard would unstyle the page
+    st.markdown(_get_css(), unsafe_allow_html=True)
 
 # ==================== CUSTOM DATASET LOADING FUNCTIONS ====================
 
+# Column dtypes for each upload type; columns not listed here are skipped on read.
+# Integer fields are read as float64 (so values like 75.5 still parse) and cast to int after loading.
+_LEARNER_DTYPES = {
+    'learner_name': 'string',
+    'learner_id': 'string',
+    'engagement_score': 'float64',
+    'learning_pace': 'category',
+    'classification': 'category',
+    'strengths': 'string',
+    'weaknesses': 'string'
+}
+
+_QUIZ_HISTORY_DTYPES = {
+    'learner_name': 'string',
+    'accuracy': 'float64',
+    'avg_time': 'float64',
+    'hints_used': 'float64',
+    'retries': 'float64',
+    'date': 'string',
+    'topic': 'category'
+}
+
+_QUESTIONS_DTYPES = {
+    'topic': 'string',
+    'difficulty': 'string',
+    'question': 'string',
+    'option1': 'string',
+    'option2': 'string',
+    'option3': 'string',
+    'option4': 'string',
+    'correct_index': 'float64',
+    'hint': 'string',
+    'explanation': 'string'
+}
+
+# Per-quiz fields stored in each learner's quiz_history
+_QUIZ_FIELDS = ['accuracy', 'avg_time', 'hints_used', 'retries', 'date', 'topic']
+
+# Rows per chunk when streaming large quiz history / question bank files
+_CHUNK_ROWS = 50_000
+
+def _read_table(raw_bytes, dtypes, parquet=False, chunksize=None):
+    """Read only the known columns of an uploaded CSV or Parquet file, optionally in chunks"""
+    if not parquet:
+        return pd.read_csv(io.BytesIO(raw_bytes), usecols=dtypes.__contains__, dtype=dtypes, chunksize=chunksize)
+    
+    parquet_file = pq.ParquetFile(io.BytesIO(raw_bytes))
+    columns = [col for col in parquet_file.schema_arrow.names if col in dtypes]
+    if chunksize is None:
+        return parquet_file.read(columns=columns).to_pandas()
+    return (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns))
+
+def _is_parquet(uploaded_file):
+    """Whether an uploaded file is Parquet (by extension) rather than CSV"""
+    return uploaded_file.name.lower().endswith('.parquet')
+
+def _with_defaults(df, defaults):
+    """Add any missing columns to df, filled with their default values"""
+    missing = {col: value for col, value in defaults.items() if col not in df.columns}
+    return df.assign(**missing) if missing else df
+
+def _intern_labels(record):
+    """Intern a quiz record's date/topic strings so repeated values share one object"""
+    for key in ('date', 'topic'):
+        if isinstance(record[key], str):
+            record[key] = sys.intern(record[key])
+    return record
+
+def _split_list_column(col):
+    """Split a comma-separated column into per-row lists, with [] for missing values"""
+    lists = col.astype('string').str.split(',')
+    missing = lists.isna()
+    if missing.any():
+        lists[missing] = pd.Series([[] for _ in range(missing.sum())], index=lists.index[missing], dtype=object)
+    return lists
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_learners_table(raw_bytes, parquet=False):
+    """Parse learner profiles from raw CSV/Parquet bytes (cached on file content)"""
+    df = _read_table(raw_bytes, _LEARNER_DTYPES, parquet)
+    
+    if 'learner_name' not in df.columns:
+        learner_ids = df['learner_id'].astype(str) if 'learner_id' in df.columns else 'Unknown'
+        df['learner_name'] = "Learner_" + learner_ids
+    if 'learner_id' not in df.columns:
+        df['learner_id'] = [f"L{random.randint(100, 999)}" for _ in range(len(df))]
+    
+    df = _with_defaults(df, {
+        'engagement_score': 70,
+        'learning_pace': 'moderate',
+        'classification': 'Average Learner',
+        'strengths': np.nan,
+        'weaknesses': np.nan
+    })
+    df['engagement_score'] = df['engagement_score'].astype(int)
+    df['strengths'] = _split_list_column(df['strengths'])
+    df['weaknesses'] = _split_list_column(df['weaknesses'])
+    
+    return {
+        r['learner_name']: {
+            "id": r['learner_id'],
+            "quiz_history": [],
+            "engagement_score": r['engagement_score'],
+            "learning_pace": r['learning_pace'],
+            "classification": r['classification'],
+            "strengths": r['strengths'],
+            "weaknesses": r['weaknesses']
+        }
+        for r in df.to_dict('records')
+    }
+
 def load_custom_learners_csv(uploaded_file):
     """
-    Load learner data from CSV file
+    Load learner data from CSV (or Parquet) file
     Expected columns: learner_name, learner_id, engagement_score, learning_pace, classification
     """
     try:
-        df = pd.read_csv(uploaded_file)
-        learners_data = {}
-        
-        for _, row in df.iterrows():
-            learner_name = row.get('learner_name', f"Learner_{row.get('learner_id', 'Unknown')}")
-            learners_data[learner_name] = {
-                "id": row.get('learner_id', f"L{random.randint(100, 999)}"),
-                "quiz_history": [],
-                "engagement_score": int(row.get('engagement_score', 70)),
-                "learning_pace": row.get('learning_pace', 'moderate'),
-                "classification": row.get('classification', 'Average Learner'),
-                "strengths": row.get('strengths', 'Consistent Performance').split(',') if pd.notna(row.get('strengths')) else [],
-                "weaknesses": row.get('weaknesses', 'Complex Problems').split(',') if pd.notna(row.get('weaknesses')) else []
-            }
-        
+        learners_data = _parse_learners_table(uploaded_file.getvalue(), _is_parquet(uploaded_file))
         st.success(f"✅ Loaded {len(learners_data)} learners from CSV!")
         return learners_data
     
@@ -170,13 +304,18 @@ def load_custom_learners_csv(uploaded_file):
         st.error(f"Error loading CSV: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_json(raw_bytes):
+    """Parse a JSON upload from raw bytes (cached on file content)"""
+    return _json_loads(raw_bytes)
+
 def load_custom_learners_json(uploaded_file):
     """
     Load learner data from JSON file
     Expected format: {"learner_name": {learner_data}, ...}
     """
     try:
-        data = json.load(uploaded_file)
+        data = _parse_json(uploaded_file.getvalue())
         st.success(f"✅ Loaded {len(data)} learners from JSON!")
         return data
     
@@ -184,28 +323,39 @@ def load_custom_learners_json(uploaded_file):
         st.error(f"Error loading JSON: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_quiz_history_table(raw_bytes, parquet=False):
+    """Parse quiz history from raw CSV/Parquet bytes (cached on file content)"""
+    defaults = {
+        'learner_name': 'Unknown',
+        'accuracy': 70,
+        'avg_time': 50,
+        'hints_used': 0,
+        'retries': 0,
+        'date': datetime.now().strftime("%Y-%m-%d"),
+        'topic': 'General'
+    }
+    quiz_history = defaultdict(list)
+    
+    for chunk in _read_table(raw_bytes, _QUIZ_HISTORY_DTYPES, parquet, chunksize=_CHUNK_ROWS):
+        chunk = _with_defaults(chunk, defaults)
+        chunk = chunk.astype({'accuracy': float, 'avg_time': float, 'hints_used': int, 'retries': int})
+        
+        records = chunk[_QUIZ_FIELDS].to_dict('records')
+        for learner_name, record in zip(chunk['learner_name'].tolist(), records):
+            quiz_history[learner_name].append(_intern_labels(record))
+    
+    return dict(quiz_history)
+
 def load_quiz_history_csv(uploaded_file):
     """
-    Load quiz history from CSV file
+    Load quiz history from CSV (or Parquet) file
     Expected columns: learner_name, accuracy, avg_time, hints_used, retries, date, topic
     """
     try:
-        df = pd.read_csv(uploaded_file)
-        quiz_history = defaultdict(list)
-        
-        for _, row in df.iterrows():
-            learner_name = row.get('learner_name', 'Unknown')
-            quiz_history[learner_name].append({
-                "accuracy": float(row.get('accuracy', 70)),
-                "avg_time": float(row.get('avg_time', 50)),
-                "hints_used": int(row.get('hints_used', 0)),
-                "retries": int(row.get('retries', 0)),
-                "date": row.get('date', datetime.now().strftime("%Y-%m-%d")),
-                "topic": row.get('topic', 'General')
-            })
-        
+        quiz_history = _parse_quiz_history_table(uploaded_file.getvalue(), _is_parquet(uploaded_file))
         st.success(f"✅ Loaded quiz history for {len(quiz_history)} learners!")
-        return dict(quiz_history)
+        return quiz_history
     
     except Exception as e:
         st.error(f"Error loading quiz history: {str(e)}")
@@ -217,7 +367,7 @@ def load_custom_questions_json(uploaded_file):
     Expected format: {"topic": {"difficulty": [questions]}}
     """
     try:
-        questions = json.load(uploaded_file)
+        questions = _parse_json(uploaded_file.getvalue())
         st.success(f"✅ Loaded custom quiz questions!")
         return questions
     
@@ -225,43 +375,77 @@ def load_custom_questions_json(uploaded_file):
         st.error(f"Error loading questions: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_questions_table(raw_bytes, parquet=False):
+    """Parse quiz questions from raw CSV/Parquet bytes (cached on file content)"""
+    defaults = {
+        'topic': 'General',
+        'difficulty': 'medium',
+        'question': '',
+        'option1': '',
+        'option2': '',
+        'option3': '',
+        'option4': '',
+        'correct_index': 0,
+        'hint': 'Think carefully about this question',
+        'explanation': 'Review the concept'
+    }
+    questions_db = {}
+    
+    for chunk in _read_table(raw_bytes, _QUESTIONS_DTYPES, parquet, chunksize=_CHUNK_ROWS):
+        chunk = _with_defaults(chunk, defaults)
+        chunk['correct'] = chunk['correct_index'].astype(int)
+        chunk['options'] = chunk[['option1', 'option2', 'option3', 'option4']].values.tolist()
+        
+        for (topic, difficulty), group in chunk.groupby(['topic', 'difficulty'], sort=False, dropna=False):
+            questions_db.setdefault(topic, {}).setdefault(difficulty, []).extend(
+                group[['question', 'options', 'correct', 'hint', 'explanation']].to_dict('records')
+            )
+    
+    return questions_db
+
 def load_custom_questions_csv(uploaded_file):
     """
-    Load quiz questions from CSV
+    Load quiz questions from CSV (or Parquet)
     Expected columns: topic, difficulty, question, option1, option2, option3, option4, correct_index, hint, explanation
     """
     try:
-        df = pd.read_csv(uploaded_file)
-        questions_db = defaultdict(lambda: defaultdict(list))
-        
-        for _, row in df.iterrows():
-            topic = row.get('topic', 'General')
-            difficulty = row.get('difficulty', 'medium')
-            
-            question_data = {
-                "question": row.get('question', ''),
-                "options": [
-                    row.get('option1', ''),
-                    row.get('option2', ''),
-                    row.get('option3', ''),
-                    row.get('option4', '')
-                ],
-                "correct": int(row.get('correct_index', 0)),
-                "hint": row.get('hint', 'Think carefully about this question'),
-                "explanation": row.get('explanation', 'Review the concept')
-            }
-            
-            questions_db[topic][difficulty].append(question_data)
-        
+        questions_db = _parse_questions_table(uploaded_file.getvalue(), _is_parquet(uploaded_file))
         st.success(f"✅ Loaded {sum(len(q) for t in questions_db.values() for q in t.values())} questions!")
-        return dict(questions_db)
+        return questions_db
     
     except Exception as e:
         st.error(f"Error loading questions CSV: {str(e)}")
         return None
 
-def export_learner_data_csv(learners_data):
-    """Export current learner data to CSV format"""
+def _arrow_safe(df):
+    """Stringify object columns holding mixed types (e.g. int and str ids), which Arrow cannot convert"""
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')
+    ]
+    if not mixed:
+        return df
+    return df.assign(**{col: df[col].map(str, na_action='ignore') for col in mixed})
+
+def _to_parquet_bytes(df):
+    """Serialize a DataFrame to zstd-compressed Parquet bytes"""
+    buf = io.BytesIO()
+    _arrow_safe(df).to_parquet(buf, engine='pyarrow', compression='zstd', index=False)
+    return buf.getvalue()
+
+def _to_csv_bytes(df):
+    """Serialize a DataFrame to CSV bytes with Arrow's columnar CSV writer"""
+    buf = io.BytesIO()
+    pa_csv.write_csv(
+        pa.Table.from_pandas(_arrow_safe(df), preserve_index=False),
+        buf,
+        pa_csv.WriteOptions(quoting_style='needed')
+    )
+    return buf.getvalue()
+
+def _learners_frame(learners_data):
+    """Build the learner profiles export table"""
     data = []
     for name, learner in learners_data.items():
         data.append({
@@ -274,26 +458,23 @@ def export_learner_data_csv(learners_data):
             'weaknesses': ','.join(learner['weaknesses'])
         })
     
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False)
+    return pd.DataFrame(data)
+
+def export_learner_data_csv(learners_data):
+    """Export current learner data to CSV format"""
+    return _to_csv_bytes(_learners_frame(learners_data))
+
+def export_learner_data_parquet(learners_data):
+    """Export current learner data to Parquet format"""
+    return _to_parquet_bytes(_learners_frame(learners_data))
 
 def export_quiz_history_csv(learners_data):
     """Export quiz history to CSV format"""
-    data = []
-    for name, learner in learners_data.items():
-        for quiz in learner['quiz_history']:
-            data.append({
-                'learner_name': name,
-                'accuracy': quiz['accuracy'],
-                'avg_time': quiz['avg_time'],
-                'hints_used': quiz['hints_used'],
-                'retries': quiz['retries'],
-                'date': quiz['date'],
-                'topic': quiz['topic']
-            })
-    
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False)
+    return _to_csv_bytes(get_quiz_frame(learners_data))
+
+def export_quiz_history_parquet(learners_data):
+    """Export quiz history to Parquet format"""
+    return _to_parquet_bytes(get_quiz_frame(learners_data))
 
 # ==================== DATA INITIALIZATION ====================
 
@@ -304,6 +485,7 @@ def initialize_session_state():
         st.session_state.current_learner = None
         st.session_state.learners_data = generate_sample_learners()
         st.session_state.custom_questions_db = None
+        st.session_state.custom_questions_flat = {}
         st.session_state.quiz_history = []
         st.session_state.current_quiz = None
         st.session_state.current_question_index = 0
@@ -313,348 +495,493 @@ def initialize_session_state():
         st.session_state.learner_profile_updated = False
         st.session_state.using_custom_data = False
 
+# Sample learner profiles with realistic data, shared template for every session
+_SAMPLE_LEARNERS = {
+    "Alice Johnson": {
+        "id": "L001",
+        "quiz_history": [
+            {"accuracy": 45, "avg_time": 85, "hints_used": 8, "retries": 3, "date": "2026-01-10", "topic": "Algebra"},
+            {"accuracy": 52, "avg_time": 78, "hints_used": 6, "retries": 2, "date": "2026-01-12", "topic": "Geometry"},
+            {"accuracy": 48, "avg_time": 82, "hints_used": 7, "retries": 3, "date": "2026-01-14", "topic": "Algebra"}
+        ],
+        "engagement_score": 62,
+        "learning_pace": "slow",
+        "classification": "Struggling Learner",
+        "strengths": ["Visual Learning", "Pattern Recognition"],
+        "weaknesses": ["Abstract Reasoning", "Time Management"]
+    },
+    "Bob Smith": {
+        "id": "L002",
+        "quiz_history": [
+            {"accuracy": 75, "avg_time": 45, "hints_used": 2, "retries": 0, "date": "2026-01-10", "topic": "Algebra"},
+            {"accuracy": 78, "avg_time": 42, "hints_used": 1, "retries": 0, "date": "2026-01-12", "topic": "Geometry"},
+            {"accuracy": 73, "avg_time": 48, "hints_used": 2, "retries": 1, "date": "2026-01-14", "topic": "Statistics"}
+        ],
+        "engagement_score": 78,
+        "learning_pace": "moderate",
+        "classification": "Average Learner",
+        "strengths": ["Consistent Performance", "Good Understanding"],
+        "weaknesses": ["Complex Problem Solving", "Advanced Concepts"]
+    },
+    "Carol Williams": {
+        "id": "L003",
+        "quiz_history": [
+            {"accuracy": 92, "avg_time": 28, "hints_used": 0, "retries": 0, "date": "2026-01-10", "topic": "Algebra"},
+            {"accuracy": 95, "avg_time": 25, "hints_used": 0, "retries": 0, "date": "2026-01-12", "topic": "Geometry"},
+            {"accuracy": 94, "avg_time": 26, "hints_used": 0, "retries": 0, "date": "2026-01-14", "topic": "Calculus"}
+        ],
+        "engagement_score": 95,
+        "learning_pace": "fast",
+        "classification": "Advanced Learner",
+        "strengths": ["Quick Comprehension", "Problem Solving", "Self-Directed"],
+        "weaknesses": ["May skip fundamentals", "Needs challenges"]
+    },
+    "David Brown": {
+        "id": "L004",
+        "quiz_history": [
+            {"accuracy": 68, "avg_time": 55, "hints_used": 3, "retries": 1, "date": "2026-01-10", "topic": "Algebra"},
+            {"accuracy": 71, "avg_time": 52, "hints_used": 2, "retries": 1, "date": "2026-01-12", "topic": "Geometry"},
+            {"accuracy": 69, "avg_time": 58, "hints_used": 3, "retries": 2, "date": "2026-01-14", "topic": "Algebra"}
+        ],
+        "engagement_score": 72,
+        "learning_pace": "moderate",
+        "classification": "Average Learner",
+        "strengths": ["Persistence", "Improvement Mindset"],
+        "weaknesses": ["Confidence", "Speed"]
+    }
+}
+
 def generate_sample_learners():
     """Generate sample learner profiles with realistic data"""
-    learners = {
-        "Alice Johnson": {
-            "id": "L001",
-            "quiz_history": [
-                {"accuracy": 45, "avg_time": 85, "hints_used": 8, "retries": 3, "date": "2026-01-10", "topic": "Algebra"},
-                {"accuracy": 52, "avg_time": 78, "hints_used": 6, "retries": 2, "date": "2026-01-12", "topic": "Geometry"},
-                {"accuracy": 48, "avg_time": 82, "hints_used": 7, "retries": 3, "date": "2026-01-14", "topic": "Algebra"}
-            ],
-            "engagement_score": 62,
-            "learning_pace": "slow",
-            "classification": "Struggling Learner",
-            "strengths": ["Visual Learning", "Pattern Recognition"],
-            "weaknesses": ["Abstract Reasoning", "Time Management"]
-        },
-        "Bob Smith": {
-            "id": "L002",
-            "quiz_history": [
-                {"accuracy": 75, "avg_time": 45, "hints_used": 2, "retries": 0, "date": "2026-01-10", "topic": "Algebra"},
-                {"accuracy": 78, "avg_time": 42, "hints_used": 1, "retries": 0, "date": "2026-01-12", "topic": "Geometry"},
-                {"accuracy": 73, "avg_time": 48, "hints_used": 2, "retries": 1, "date": "2026-01-14", "topic": "Statistics"}
-            ],
-            "engagement_score": 78,
-            "learning_pace": "moderate",
-            "classification": "Average Learner",
-            "strengths": ["Consistent Performance", "Good Understanding"],
-            "weaknesses": ["Complex Problem Solving", "Advanced Concepts"]
-        },
-        "Carol Williams": {
-            "id": "L003",
-            "quiz_history": [
-                {"accuracy": 92, "avg_time": 28, "hints_used": 0, "retries": 0, "date": "2026-01-10", "topic": "Algebra"},
-                {"accuracy": 95, "avg_time": 25, "hints_used": 0, "retries": 0, "date": "2026-01-12", "topic": "Geometry"},
-                {"accuracy": 94, "avg_time": 26, "hints_used": 0, "retries": 0, "date": "2026-01-14", "topic": "Calculus"}
-            ],
-            "engagement_score": 95,
-            "learning_pace": "fast",
-            "classification": "Advanced Learner",
-            "strengths": ["Quick Comprehension", "Problem Solving", "Self-Directed"],
-            "weaknesses": ["May skip fundamentals", "Needs challenges"]
-        },
-        "David Brown": {
-            "id": "L004",
-            "quiz_history": [
-                {"accuracy": 68, "avg_time": 55, "hints_used": 3, "retries": 1, "date": "2026-01-10", "topic": "Algebra"},
-                {"accuracy": 71, "avg_time": 52, "hints_used": 2, "retries": 1, "date": "2026-01-12", "topic": "Geometry"},
-                {"accuracy": 69, "avg_time": 58, "hints_used": 3, "retries": 2, "date": "2026-01-14", "topic": "Algebra"}
-            ],
-            "engagement_score": 72,
-            "learning_pace": "moderate",
-            "classification": "Average Learner",
-            "strengths": ["Persistence", "Improvement Mindset"],
-            "weaknesses": ["Confidence", "Speed"]
-        }
+    # Only quiz_history grows during a session, so the rest of each profile can be shared
+    return {
+        name: {**profile, "quiz_history": list(profile["quiz_history"])}
+        for name, profile in _SAMPLE_LEARNERS.items()
     }
-    return learners
 
 # ==================== QUIZ QUESTIONS DATABASE ====================
 
+# Default questions database
+_DEFAULT_QUESTIONS_DB = {
+    "Algebra": {
+        "easy": [
+            {
+                "question": "Solve for x: 2x + 5 = 13",
+                "options": ["x = 3", "x = 4", "x = 5", "x = 6"],
+                "correct": 1,
+                "hint": "Subtract 5 from both sides first, then divide by 2",
+                "explanation": "First, subtract 5 from both sides: 2x = 8. Then divide both sides by 2: x = 4"
+            },
+            {
+                "question": "What is 3(x + 2) expanded?",
+                "options": ["3x + 2", "3x + 5", "3x + 6", "x + 6"],
+                "correct": 2,
+                "hint": "Multiply 3 by each term inside the parentheses",
+                "explanation": "Using the distributive property: 3 × x = 3x and 3 × 2 = 6, so 3x + 6"
+            },
+            {
+                "question": "If y = 2x and x = 3, what is y?",
+                "options": ["5", "6", "7", "8"],
+                "correct": 1,
+                "hint": "Substitute x = 3 into the equation y = 2x",
+                "explanation": "y = 2 × 3 = 6"
+            }
+        ],
+        "medium": [
+            {
+                "question": "Solve: 3x - 7 = 2x + 5",
+                "options": ["x = 10", "x = 11", "x = 12", "x = 13"],
+                "correct": 2,
+                "hint": "Get all x terms on one side and constants on the other",
+                "explanation": "Subtract 2x from both sides: x - 7 = 5. Add 7 to both sides: x = 12"
+            },
+            {
+                "question": "Factor: x² + 5x + 6",
+                "options": ["(x+2)(x+3)", "(x+1)(x+6)", "(x+4)(x+2)", "(x+5)(x+1)"],
+                "correct": 0,
+                "hint": "Find two numbers that multiply to 6 and add to 5",
+                "explanation": "2 and 3 multiply to 6 and add to 5, so (x+2)(x+3)"
+            },
+            {
+                "question": "Simplify: (2x²y)(3xy²)",
+                "options": ["5x³y³", "6x³y³", "6x²y²", "5xy"],
+                "correct": 1,
+                "hint": "Multiply coefficients and add exponents of like bases",
+                "explanation": "2 × 3 = 6, x² × x = x³, y × y² = y³, giving 6x³y³"
+            }
+        ],
+        "hard": [
+            {
+                "question": "Solve the quadratic equation: x² - 7x + 12 = 0",
+                "options": ["x = 2, 5", "x = 3, 4", "x = 1, 6", "x = 2, 6"],
+                "correct": 1,
+                "hint": "Factor or use the quadratic formula",
+                "explanation": "(x-3)(x-4) = 0, so x = 3 or x = 4"
+            },
+            {
+                "question": "If f(x) = 2x² - 3x + 1, what is f(3)?",
+                "options": ["8", "10", "12", "14"],
+                "correct": 1,
+                "hint": "Substitute x = 3 into the function",
+                "explanation": "f(3) = 2(3)² - 3(3) + 1 = 2(9) - 9 + 1 = 18 - 9 + 1 = 10"
+            },
+            {
+                "question": "Solve for x: (x+2)² = 25",
+                "options": ["x = 3 or -7", "x = 5 or -5", "x = 2 or -2", "x = 3 or 7"],
+                "correct": 0,
+                "hint": "Take the square root of both sides, remembering ±",
+                "explanation": "x+2 = ±5, so x = 3 or x = -7"
+            }
+        ]
+    },
+    "Geometry": {
+        "easy": [
+            {
+                "question": "What is the area of a rectangle with length 8 and width 5?",
+                "options": ["13", "26", "40", "45"],
+                "correct": 2,
+                "hint": "Area = length × width",
+                "explanation": "Area = 8 × 5 = 40 square units"
+            },
+            {
+                "question": "How many degrees are in a right angle?",
+                "options": ["45°", "60°", "90°", "180°"],
+                "correct": 2,
+                "hint": "A right angle forms a perfect corner, like the letter L",
+                "explanation": "A right angle is exactly 90 degrees"
+            },
+            {
+                "question": "What is the perimeter of a square with side length 6?",
+                "options": ["12", "18", "24", "36"],
+                "correct": 2,
+                "hint": "Perimeter = 4 × side for a square",
+                "explanation": "Perimeter = 4 × 6 = 24 units"
+            }
+        ],
+        "medium": [
+            {
+                "question": "Find the area of a triangle with base 10 and height 6",
+                "options": ["16", "30", "60", "120"],
+                "correct": 1,
+                "hint": "Area = (1/2) × base × height",
+                "explanation": "Area = (1/2) × 10 × 6 = 30 square units"
+            },
+            {
+                "question": "What is the circumference of a circle with radius 7? (Use π ≈ 3.14)",
+                "options": ["21.98", "43.96", "153.86", "307.72"],
+                "correct": 1,
+                "hint": "Circumference = 2πr",
+                "explanation": "C = 2 × 3.14 × 7 = 43.96 units"
+            },
+            {
+                "question": "If two angles in a triangle are 45° and 60°, what is the third angle?",
+                "options": ["65°", "70°", "75°", "80°"],
+                "correct": 2,
+                "hint": "Angles in a triangle sum to 180°",
+                "explanation": "180° - 45° - 60° = 75°"
+            }
+        ],
+        "hard": [
+            {
+                "question": "Find the area of a circle with diameter 14 (Use π ≈ 3.14)",
+                "options": ["43.96", "153.86", "307.72", "615.44"],
+                "correct": 1,
+                "hint": "First find the radius (diameter ÷ 2), then use A = πr²",
+                "explanation": "r = 7, A = 3.14 × 7² = 3.14 × 49 = 153.86 square units"
+            },
+            {
+                "question": "A rectangular prism has dimensions 4×5×6. What is its volume?",
+                "options": ["60", "80", "100", "120"],
+                "correct": 3,
+                "hint": "Volume = length × width × height",
+                "explanation": "V = 4 × 5 × 6 = 120 cubic units"
+            },
+            {
+                "question": "What is the length of the hypotenuse in a right triangle with legs 6 and 8?",
+                "options": ["8", "10", "12", "14"],
+                "correct": 1,
+                "hint": "Use the Pythagorean theorem: a² + b² = c²",
+                "explanation": "6² + 8² = 36 + 64 = 100 = 10²; hypotenuse = 10"
+            }
+        ]
+    },
+    "Statistics": {
+        "easy": [
+            {
+                "question": "What is the mean of 5, 10, 15, 20?",
+                "options": ["10", "12.5", "15", "17.5"],
+                "correct": 1,
+                "hint": "Mean = sum of values ÷ number of values",
+                "explanation": "Mean = (5+10+15+20) ÷ 4 = 50 ÷ 4 = 12.5"
+            },
+            {
+                "question": "What is the median of 3, 7, 5, 9, 11?",
+                "options": ["5", "7", "9", "11"],
+                "correct": 1,
+                "hint": "Sort the numbers and find the middle value",
+                "explanation": "Sorted: 3, 5, 7, 9, 11. Middle value is 7"
+            },
+            {
+                "question": "What is the mode of 2, 3, 3, 5, 6, 3, 7?",
+                "options": ["2", "3", "5", "7"],
+                "correct": 1,
+                "hint": "Mode is the most frequently occurring value",
+                "explanation": "3 appears three times, more than any other value"
+            }
+        ],
+        "medium": [
+            {
+                "question": "Calculate the range of: 12, 18, 15, 22, 9, 25",
+                "options": ["13", "14", "15", "16"],
+                "correct": 3,
+                "hint": "Range = maximum value - minimum value",
+                "explanation": "Range = 25 - 9 = 16"
+            },
+            {
+                "question": "If the mean of 4 numbers is 15 and three of them are 10, 12, 18, what's the fourth?",
+                "options": ["18", "20", "22", "24"],
+                "correct": 1,
+                "hint": "Total sum = mean × count, then solve for the missing number",
+                "explanation": "Total = 15 × 4 = 60. Fourth number = 60 - 10 - 12 - 18 = 20"
+            }
+        ],
+        "hard": [
+            {
+                "question": "Calculate the variance of: 4, 8, 6, 5, 3, 9 (mean = 5.83)",
+                "options": ["4.47", "5.14", "6.81", "7.25"],
+                "correct": 0,
+                "hint": "Variance = average of squared differences from mean",
+                "explanation": "Variance ≈ 4.47 (detailed calculation involves squaring deviations)"
+            }
+        ]
+    },
+    "Calculus": {
+        "medium": [
+            {
+                "question": "What is the derivative of f(x) = 3x²?",
+                "options": ["3x", "6x", "x²", "3x³"],
+                "correct": 1,
+                "hint": "Use the power rule: d/dx(xⁿ) = n·xⁿ⁻¹",
+                "explanation": "Using power rule: 3 × 2 × x¹ = 6x"
+            },
+            {
+                "question": "What is ∫ 2x dx?",
+                "options": ["2x", "x²", "x² + C", "2x² + C"],
+                "correct": 2,
+                "hint": "Reverse the power rule and add constant C",
+                "explanation": "∫ 2x dx = x² + C"
+            }
+        ],
+        "hard": [
+            {
+                "question": "Find the derivative of f(x) = x³ - 4x² + 7x - 2",
+                "options": ["3x² - 8x + 7", "3x² - 4x + 7", "x² - 8x + 7", "3x³ - 8x + 7"],
+                "correct": 0,
+                "hint": "Apply power rule to each term separately",
+                "explanation": "f'(x) = 3x² - 8x + 7"
+            },
+            {
+                "question": "What is the limit of (x² - 4)/(x - 2) as x approaches 2?",
+                "options": ["0", "2", "4", "undefined"],
+                "correct": 2,
+                "hint": "Factor the numerator and simplify before substituting",
+                "explanation": "(x² - 4)/(x - 2) = (x+2)(x-2)/(x-2) = x + 2, so limit = 4"
+            }
+        ]
+    }
+}
+
+# Flat (topic, difficulty) -> questions index over the default bank, with read-only questions
+_QUESTIONS_INDEX = {
+    (topic, difficulty): tuple(MappingProxyType(question) for question in questions)
+    for topic, levels in _DEFAULT_QUESTIONS_DB.items()
+    for difficulty, questions in levels.items()
+}
+
+def flatten_questions(questions_db):
+    """Flatten a nested {topic: {difficulty: [questions]}} bank into a (topic, difficulty) -> questions dict"""
+    return {
+        (topic, difficulty): questions
+        for topic, levels in questions_db.items()
+        for difficulty, questions in levels.items()
+    }
+
 def get_quiz_questions(topic, difficulty):
     """Return quiz questions based on topic and difficulty level"""
     # Use custom questions if available
-    if st.session_state.custom_questions_db:
-        custom_questions = st.session_state.custom_questions_db.get(topic, {}).get(difficulty, [])
-        if custom_questions:
-            return custom_questions
-    
-    # Default questions database
-    questions_db = {
-        "Algebra": {
-            "easy": [
-                {
-                    "question": "Solve for x: 2x + 5 = 13",
-                    "options": ["x = 3", "x = 4", "x = 5", "x = 6"],
-                    "correct": 1,
-                    "hint": "Subtract 5 from both sides first, then divide by 2",
-                    "explanation": "First, subtract 5 from both sides: 2x = 8. Then divide both sides by 2: x = 4"
-                },
-                {
-                    "question": "What is 3(x + 2) expanded?",
-                    "options": ["3x + 2", "3x + 5", "3x + 6", "x + 6"],
-                    "correct": 2,
-                    "hint": "Multiply 3 by each term inside the parentheses",
-                    "explanation": "Using the distributive property: 3 × x = 3x and 3 × 2 = 6, so 3x + 6"
-                },
-                {
-                    "question": "If y = 2x and x = 3, what is y?",
-                    "options": ["5", "6", "7", "8"],
-                    "correct": 1,
-                    "hint": "Substitute x = 3 into the equation y = 2x",
-                    "explanation": "y = 2 × 3 = 6"
-                }
-            ],
-            "medium": [
-                {
-                    "question": "Solve: 3x - 7 = 2x + 5",
-                    "options": ["x = 10", "x = 11", "x = 12", "x = 13"],
-                    "correct": 2,
-                    "hint": "Get all x terms on one side and constants on the other",
-                    "explanation": "Subtract 2x from both sides: x - 7 = 5. Add 7 to both sides: x = 12"
-                },
-                {
-                    "question": "Factor: x² + 5x + 6",
-                    "options": ["(x+2)(x+3)", "(x+1)(x+6)", "(x+4)(x+2)", "(x+5)(x+1)"],
-                    "correct": 0,
-                    "hint": "Find two numbers that multiply to 6 and add to 5",
-                    "explanation": "2 and 3 multiply to 6 and add to 5, so (x+2)(x+3)"
-                },
-                {
-                    "question": "Simplify: (2x²y)(3xy²)",
-                    "options": ["5x³y³", "6x³y³", "6x²y²", "5xy"],
-                    "correct": 1,
-                    "hint": "Multiply coefficients and add exponents of like bases",
-                    "explanation": "2 × 3 = 6, x² × x = x³, y × y² = y³, giving 6x³y³"
-                }
-            ],
-            "hard": [
-                {
-                    "question": "Solve the quadratic equation: x² - 7x + 12 = 0",
-                    "options": ["x = 2, 5", "x = 3, 4", "x = 1, 6", "x = 2, 6"],
-                    "correct": 1,
-                    "hint": "Factor or use the quadratic formula",
-                    "explanation": "(x-3)(x-4) = 0, so x = 3 or x = 4"
-                },
-                {
-                    "question": "If f(x) = 2x² - 3x + 1, what is f(3)?",
-                    "options": ["8", "10", "12", "14"],
-                    "correct": 1,
-                    "hint": "Substitute x = 3 into the function",
-                    "explanation": "f(3) = 2(3)² - 3(3) + 1 = 2(9) - 9 + 1 = 18 - 9 + 1 = 10"
-                },
-                {
-                    "question": "Solve for x: (x+2)² = 25",
-                    "options": ["x = 3 or -7", "x = 5 or -5", "x = 2 or -2", "x = 3 or 7"],
-                    "correct": 0,
-                    "hint": "Take the square root of both sides, remembering ±",
-                    "explanation": "x+2 = ±5, so x = 3 or x = -7"
-                }
-            ]
-        },
-        "Geometry": {
-            "easy": [
-                {
-                    "question": "What is the area of a rectangle with length 8 and width 5?",
-                    "options": ["13", "26", "40", "45"],
-                    "correct": 2,
-                    "hint": "Area = length × width",
-                    "explanation": "Area = 8 × 5 = 40 square units"
-                },
-                {
-                    "question": "How many degrees are in a right angle?",
-                    "options": ["45°", "60°", "90°", "180°"],
-                    "correct": 2,
-                    "hint": "A right angle forms a perfect corner, like the letter L",
-                    "explanation": "A right angle is exactly 90 degrees"
-                },
-                {
-                    "question": "What is the perimeter of a square with side length 6?",
-                    "options": ["12", "18", "24", "36"],
-                    "correct": 2,
-                    "hint": "Perimeter = 4 × side for a square",
-                    "explanation": "Perimeter = 4 × 6 = 24 units"
-                }
-            ],
-            "medium": [
-                {
-                    "question": "Find the area of a triangle with base 10 and height 6",
-                    "options": ["16", "30", "60", "120"],
-                    "correct": 1,
-                    "hint": "Area = (1/2) × base × height",
-                    "explanation": "Area = (1/2) × 10 × 6 = 30 square units"
-                },
-                {
-                    "question": "What is the circumference of a circle with radius 7? (Use π ≈ 3.14)",
-                    "options": ["21.98", "43.96", "153.86", "307.72"],
-                    "correct": 1,
-                    "hint": "Circumference = 2πr",
-                    "explanation": "C = 2 × 3.14 × 7 = 43.96 units"
-                },
-                {
-                    "question": "If two angles in a triangle are 45° and 60°, what is the third angle?",
-                    "options": ["65°", "70°", "75°", "80°"],
-                    "correct": 2,
-                    "hint": "Angles in a triangle sum to 180°",
-                    "explanation": "180° - 45° - 60° = 75°"
-                }
-            ],
-            "hard": [
-                {
-                    "question": "Find the area of a circle with diameter 14 (Use π ≈ 3.14)",
-                    "options": ["43.96", "153.86", "307.72", "615.44"],
-                    "correct": 1,
-                    "hint": "First find the radius (diameter ÷ 2), then use A = πr²",
-                    "explanation": "r = 7, A = 3.14 × 7² = 3.14 × 49 = 153.86 square units"
-                },
-                {
-                    "question": "A rectangular prism has dimensions 4×5×6. What is its volume?",
-                    "options": ["60", "80", "100", "120"],
-                    "correct": 3,
-                    "hint": "Volume = length × width × height",
-                    "explanation": "V = 4 × 5 × 6 = 120 cubic units"
-                },
-                {
-                    "question": "What is the length of the hypotenuse in a right triangle with legs 6 and 8?",
-                    "options": ["8", "10", "12", "14"],
-                    "correct": 1,
-                    "hint": "Use the Pythagorean theorem: a² + b² = c²",
-                    "explanation": "6² + 8² = 36 + 64 = 100 = 10²; hypotenuse = 10"
-                }
-            ]
-        },
-        "Statistics": {
-            "easy": [
-                {
-                    "question": "What is the mean of 5, 10, 15, 20?",
-                    "options": ["10", "12.5", "15", "17.5"],
-                    "correct": 1,
-                    "hint": "Mean = sum of values ÷ number of values",
-                    "explanation": "Mean = (5+10+15+20) ÷ 4 = 50 ÷ 4 = 12.5"
-                },
-                {
-                    "question": "What is the median of 3, 7, 5, 9, 11?",
-                    "options": ["5", "7", "9", "11"],
-                    "correct": 1,
-                    "hint": "Sort the numbers and find the middle value",
-                    "explanation": "Sorted: 3, 5, 7, 9, 11. Middle value is 7"
-                },
-                {
-                    "question": "What is the mode of 2, 3, 3, 5, 6, 3, 7?",
-                    "options": ["2", "3", "5", "7"],
-                    "correct": 1,
-                    "hint": "Mode is the most frequently occurring value",
-                    "explanation": "3 appears three times, more than any other value"
-                }
-            ],
-            "medium": [
-                {
-                    "question": "Calculate the range of: 12, 18, 15, 22, 9, 25",
-                    "options": ["13", "14", "15", "16"],
-                    "correct": 3,
-                    "hint": "Range = maximum value - minimum value",
-                    "explanation": "Range = 25 - 9 = 16"
-                },
-                {
-                    "question": "If the mean of 4 numbers is 15 and three of them are 10, 12, 18, what's the fourth?",
-                    "options": ["18", "20", "22", "24"],
-                    "correct": 1,
-                    "hint": "Total sum = mean × count, then solve for the missing number",
-                    "explanation": "Total = 15 × 4 = 60. Fourth number = 60 - 10 - 12 - 18 = 20"
-                }
-            ],
-            "hard": [
-                {
-                    "question": "Calculate the variance of: 4, 8, 6, 5, 3, 9 (mean = 5.83)",
-                    "options": ["4.47", "5.14", "6.81", "7.25"],
-                    "correct": 0,
-                    "hint": "Variance = average of squared differences from mean",
-                    "explanation": "Variance ≈ 4.47 (detailed calculation involves squaring deviations)"
-                }
-            ]
-        },
-        "Calculus": {
-            "medium": [
-                {
-                    "question": "What is the derivative of f(x) = 3x²?",
-                    "options": ["3x", "6x", "x²", "3x³"],
-                    "correct": 1,
-                    "hint": "Use the power rule: d/dx(xⁿ) = n·xⁿ⁻¹",
-                    "explanation": "Using power rule: 3 × 2 × x¹ = 6x"
-                },
-                {
-                    "question": "What is ∫ 2x dx?",
-                    "options": ["2x", "x²", "x² + C", "2x² + C"],
-                    "correct": 2,
-                    "hint": "Reverse the power rule and add constant C",
-                    "explanation": "∫ 2x dx = x² + C"
-                }
-            ],
-            "hard": [
-                {
-                    "question": "Find the derivative of f(x) = x³ - 4x² + 7x - 2",
-                    "options": ["3x² - 8x + 7", "3x² - 4x + 7", "x² - 8x + 7", "3x³ - 8x + 7"],
-                    "correct": 0,
-                    "hint": "Apply power rule to each term separately",
-                    "explanation": "f'(x) = 3x² - 8x + 7"
-                },
-                {
-                    "question": "What is the limit of (x² - 4)/(x - 2) as x approaches 2?",
-                    "options": ["0", "2", "4", "undefined"],
-                    "correct": 2,
-                    "hint": "Factor the numerator and simplify before substituting",
-                    "explanation": "(x² - 4)/(x - 2) = (x+2)(x-2)/(x-2) = x + 2, so limit = 4"
-                }
-            ]
-        }
-    }
-    
-    return questions_db.get(topic, {}).get(difficulty, [])
+    key = (topic, difficulty)
+    return st.session_state.custom_questions_flat.get(key) or _QUESTIONS_INDEX.get(key, [])
 
 # ==================== ML MODELS AND CLASSIFICATION ====================
 
-def classify_learner(learner_data):
-    """Classify learner based on performance metrics using ML"""
+# Numeric quiz fields kept as NumPy columns by QuizHistoryStore
+_STORE_DTYPES = {'accuracy': np.float64, 'avg_time': np.float64, 'hints_used': np.int64, 'retries': np.int64}
+
+@dataclass(eq=False)
+class QuizHistoryStore:
+    """Struct-of-arrays copy of one learner's quiz history, appended in place as quizzes are recorded"""
+    dates: list = field(default_factory=list)
+    topics: list = field(default_factory=list)
+    buffers: dict = field(default_factory=dict, repr=False)
+    _digest: bytes = field(default=None, init=False, repr=False)
+    
+    @classmethod
+    def from_history(cls, quiz_history):
+        """Build the store from a list of quiz record dicts"""
+        count = len(quiz_history)
+        buffers = {
+            col: np.fromiter((q[col] for q in quiz_history), dtype=dtype, count=count)
+            for col, dtype in _STORE_DTYPES.items()
+        }
+        return cls([q['date'] for q in quiz_history], [q['topic'] for q in quiz_history], buffers)
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def append(self, quiz):
+        """Add one quiz record, doubling the column buffers when they are full"""
+        count = len(self.dates)
+        for col, buf in self.buffers.items():
+            if count == len(buf):
+                buf = self.buffers[col] = np.resize(buf, max(2 * count, 8))
+            buf[count] = quiz[col]
+        self.dates.append(quiz['date'])
+        self.topics.append(quiz['topic'])
+        self._digest = None
+    
+    def digest(self):
+        """Content key used when a store is passed to a cached function, computed once per appended quiz"""
+        if self._digest is None:
+            count = len(self.dates)
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update("\x1f".join(map(str, self.dates)).encode())
+            hasher.update(b"\x1e")
+            hasher.update("\x1f".join(map(str, self.topics)).encode())
+            for buf in self.buffers.values():
+                hasher.update(buf[:count].tobytes())
+            self._digest = hasher.digest()
+        return self._digest
+    
+    @property
+    def accuracy(self):
+        return self.buffers['accuracy'][:len(self.dates)]
+    
+    @property
+    def avg_time(self):
+        return self.buffers['avg_time'][:len(self.dates)]
+    
+    @property
+    def hints_used(self):
+        return self.buffers['hints_used'][:len(self.dates)]
+    
+    @property
+    def retries(self):
+        return self.buffers['retries'][:len(self.dates)]
+
+def get_history_store(learner_data):
+    """Return the learner's QuizHistoryStore, catching up on any quizzes appended to quiz_history"""
     quiz_history = learner_data['quiz_history']
+    store = learner_data.get('_history_store')
+    
+    if store is None or len(store) > len(quiz_history):
+        store = learner_data['_history_store'] = QuizHistoryStore.from_history(quiz_history)
+    else:
+        for quiz in quiz_history[len(store):]:
+            store.append(quiz)
+    
+    return store
+
+def mark_history_changed(learner_data):
+    """Bump the learner's history version after quiz_history is mutated"""
+    learner_data['_version'] = learner_data.get('_version', 0) + 1
+
+def _learner_memo(learner_data, name, compute, *key):
+    """Per-learner memo of compute(learner_data), reused until the history version (or extra key) changes"""
+    stamp = (learner_data.get('_version', 0), len(learner_data['quiz_history'])) + key
+    memo = learner_data.setdefault('_memo', {})
+    entry = memo.get(name)
     
-    if not quiz_history:
-        return "New Learner"
+    if entry is None or entry[0] != stamp:
+        entry = memo[name] = (stamp, compute(learner_data))
     
-    avg_accuracy = np.mean([q['accuracy'] for q in quiz_history])
-    avg_time = np.mean([q['avg_time'] for q in quiz_history])
-    total_hints = sum([q['hints_used'] for q in quiz_history])
-    total_retries = sum([q['retries'] for q in quiz_history])
+    return entry[1]
+
+# Labels indexed by the code returned from classify_kernel
+_CLASSIFICATION_LABELS = ("New Learner", "Struggling Learner", "Average Learner", "Advanced Learner")
+
+def _classify(learner_data):
+    """Uncached classification from the learner's quiz history"""
+    store = get_history_store(learner_data)
+    code = classify_kernel(store.accuracy, store.avg_time, store.hints_used)
+    return _CLASSIFICATION_LABELS[code]
+
+def classify_learner(learner_data):
+    """Classify learner based on performance metrics using ML"""
+    return _learner_memo(learner_data, 'classification', _classify)
+
+def get_quiz_frame(learners_data):
+    """Return all learners' quiz history as one tidy DataFrame, rebuilt only when it changes"""
+    signature = tuple((name, len(data['quiz_history'])) for name, data in learners_data.items())
+    
+    if st.session_state.get('quiz_df_source') is not learners_data or st.session_state.get('quiz_df_signature') != signature:
+        quiz_df = pd.DataFrame(
+            [quiz for data in learners_data.values() for quiz in data['quiz_history']],
+            columns=_QUIZ_FIELDS
+        )
+        quiz_df.insert(0, 'learner_name', np.repeat(list(learners_data), [count for _, count in signature]))
+        st.session_state.quiz_df = quiz_df
+        st.session_state.quiz_df_source = learners_data
+        st.session_state.quiz_df_signature = signature
     
-    if avg_accuracy < 60 and (avg_time > 70 or total_hints > 5):
-        return "Struggling Learner"
-    elif avg_accuracy >= 85 and avg_time < 35 and total_hints == 0:
-        return "Advanced Learner"
+    return st.session_state.quiz_df
+
+# Cohort size above which clustering switches to mini-batch K-Means
+_MINIBATCH_KMEANS_THRESHOLD = 10_000
+
+def _feature_buffer(n_rows):
+    """Per-session scratch matrix for clustering features, regrown only when the roster outgrows it"""
+    buf = st.session_state.get('_feat_buf')
+    if buf is None or len(buf) < n_rows:
+        buf = np.empty((max(n_rows, 1024), 2), dtype=np.float64)
+        st.session_state['_feat_buf'] = buf
+    return buf[:n_rows]
+
+@st.cache_resource(ttl=3600, max_entries=32)
+def _fit_kmeans(features_scaled):
+    """Fit the learner K-Means model once per distinct (standardised) feature matrix"""
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    if len(features_scaled) > _MINIBATCH_KMEANS_THRESHOLD:
+        kmeans = MiniBatchKMeans(n_clusters=3, init='k-means++', batch_size=256, n_init=1, random_state=42)
     else:
-        return "Average Learner"
+        kmeans = KMeans(n_clusters=3, init='k-means++', n_init=10, max_iter=50, random_state=42)
+    
+    return kmeans.fit(features_scaled)
 
-def cluster_learners(learners_data):
-    """Cluster learners using K-Means based on accuracy and pace"""
+def _cluster_learners(learners_data):
+    """Uncached K-Means clustering of learners on accuracy and pace"""
     if len(learners_data) < 3:
         return {}
     
-    features = []
-    learner_names = []
+    learner_names = [name for name, data in learners_data.items() if data['quiz_history']]
     
-    for name, data in learners_data.items():
-        if data['quiz_history']:
-            avg_accuracy = np.mean([q['accuracy'] for q in data['quiz_history']])
-            avg_time = np.mean([q['avg_time'] for q in data['quiz_history']])
-            features.append([avg_accuracy, avg_time])
-            learner_names.append(name)
-    
-    if len(features) >= 3:
-        scaler = StandardScaler()
-        features_scaled = scaler.fit_transform(features)
+    if len(learner_names) >= 3:
+        # Flatten every learner's (accuracy, avg_time) columns into one matrix; learner i owns rows offsets[i]:offsets[i+1]
+        stores = [get_history_store(learners_data[name]) for name in learner_names]
+        offsets = np.zeros(len(stores) + 1, dtype=np.int64)
+        np.cumsum([len(store) for store in stores], out=offsets[1:])
+        quiz_features = np.empty((offsets[-1], 2), dtype=np.float64)
+        quiz_features[:, 0] = np.concatenate([store.accuracy for store in stores])
+        quiz_features[:, 1] = np.concatenate([store.avg_time for store in stores])
+        
+        # Average and standardise in place in the session's buffer instead of allocating a scaled copy per call
+        features_scaled = learner_means_kernel(quiz_features, offsets, _feature_buffer(len(learner_names)))
+        std = features_scaled.std(axis=0)
+        std[std == 0] = 1.0
+        features_scaled -= features_scaled.mean(axis=0)
+        features_scaled /= std
         
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(features_scaled)
+        kmeans = _fit_kmeans(features_scaled)
+        clusters = kmeans.predict(features_scaled)
         
         cluster_mapping = {}
         for name, cluster in zip(learner_names, clusters):
@@ -664,16 +991,29 @@ def cluster_learners(learners_data):
     
     return {}
 
+def cluster_learners(learners_data):
+    """Cluster learners using K-Means based on accuracy and pace, reused until any learner's history changes"""
+    signature = tuple(
+        (name, data.get('_version', 0), len(data['quiz_history']), data['quiz_history'][-1]['date'] if data['quiz_history'] else '')
+        for name, data in learners_data.items()
+    )
+    
+    if st.session_state.get('clusters_source') is not learners_data or st.session_state.get('clusters_signature') != signature:
+        st.session_state.clusters = _cluster_learners(learners_data)
+        st.session_state.clusters_source = learners_data
+        st.session_state.clusters_signature = signature
+    
+    return st.session_state.clusters
+
 def predict_next_difficulty(learner_data):
     """Predict optimal difficulty level for next quiz"""
-    quiz_history = learner_data['quiz_history']
+    store = get_history_store(learner_data)
     
-    if not quiz_history:
+    if not store:
         return "easy"
     
-    recent_performance = quiz_history[-3:] if len(quiz_history) >= 3 else quiz_history
-    avg_accuracy = np.mean([q['accuracy'] for q in recent_performance])
-    avg_time = np.mean([q['avg_time'] for q in recent_performance])
+    avg_accuracy = store.accuracy[-3:].mean()
+    avg_time = store.avg_time[-3:].mean()
     
     if avg_accuracy >= 90 and avg_time < 35:
         return "hard"
@@ -684,8 +1024,8 @@ def predict_next_difficulty(learner_data):
 
 # ==================== CONTENT ADAPTATION ENGINE ====================
 
-def adapt_content(learner_data):
-    """Dynamically adapt content based on learner performance"""
+def _adapt_content(learner_data):
+    """Uncached content adaptation for the learner's current classification and history"""
     classification = learner_data['classification']
     quiz_history = learner_data['quiz_history']
     
@@ -705,29 +1045,36 @@ def adapt_content(learner_data):
     
     return adaptations
 
+def adapt_content(learner_data):
+    """Dynamically adapt content based on learner performance"""
+    return _learner_memo(learner_data, 'adaptations', _adapt_content, learner_data['classification'])
+
+_ENCOURAGING_MESSAGES = (
+    "Fantastic! See, you can do it! 🌟",
+    "Wonderful! This is real progress!",
+    "Yes! You're getting stronger at this!"
+)
+
+# Correct-answer messages per classification, anything else gets the encouraging pool
+_SUCCESS_MESSAGES = {
+    "Advanced Learner": (
+        "Excellent! Ready for more challenges?",
+        "Perfect! Your problem-solving skills are sharp.",
+        "Outstanding! Keep pushing your limits."
+    ),
+    "Average Learner": (
+        "Great job! You're making solid progress.",
+        "Well done! Your understanding is improving.",
+        "Correct! Keep up the consistent work."
+    )
+}
+
 def generate_personalized_feedback(question_data, user_answer, correct_answer, learner_classification):
     """Generate adaptive feedback based on learner level"""
     is_correct = user_answer == correct_answer
     
     if is_correct:
-        if learner_classification == "Advanced Learner":
-            messages = [
-                "Excellent! Ready for more challenges?",
-                "Perfect! Your problem-solving skills are sharp.",
-                "Outstanding! Keep pushing your limits."
-            ]
-        elif learner_classification == "Average Learner":
-            messages = [
-                "Great job! You're making solid progress.",
-                "Well done! Your understanding is improving.",
-                "Correct! Keep up the consistent work."
-            ]
-        else:
-            messages = [
-                "Fantastic! See, you can do it! 🌟",
-                "Wonderful! This is real progress!",
-                "Yes! You're getting stronger at this!"
-            ]
+        messages = _SUCCESS_MESSAGES.get(learner_classification, _ENCOURAGING_MESSAGES)
         return random.choice(messages), "success"
     else:
         hint = question_data.get('hint', 'Try to break down the problem step by step.')
@@ -737,112 +1084,147 @@ def generate_personalized_feedback(question_data, user_answer, correct_answer, l
             feedback = f"Not correct. Think about: {hint}"
         return feedback, "error"
 
+# Recommendation templates by classification; "{topic}" is filled with the current topic
+_STRUGGLING_RECS = (
+    {
+        "type": "📹 Video Tutorial",
+        "title": "Visual Guide to {topic} Basics",
+        "description": "Step-by-step visual explanation with examples",
+        "priority": "High"
+    },
+    {
+        "type": "✏️ Guided Practice",
+        "title": "Interactive Practice Problems",
+        "description": "Practice with instant feedback and hints",
+        "priority": "High"
+    },
+    {
+        "type": "📝 Revision Summary",
+        "title": "{topic} Key Concepts Review",
+        "description": "Quick reference sheet with formulas and examples",
+        "priority": "Medium"
+    },
+    {
+        "type": "🎯 Focus Session",
+        "title": "One-on-One Tutoring Recommended",
+        "description": "Personalized help with difficult concepts",
+        "priority": "High"
+    }
+)
+
+_ADVANCED_RECS = (
+    {
+        "type": "🏆 Challenge Problem",
+        "title": "Advanced {topic} Competition Problems",
+        "description": "Olympiad-level questions to test your skills",
+        "priority": "High"
+    },
+    {
+        "type": "🔬 Research Project",
+        "title": "Real-World Application Project",
+        "description": "Apply concepts to solve real problems",
+        "priority": "Medium"
+    },
+    {
+        "type": "👥 Peer Teaching",
+        "title": "Help Others Learn",
+        "description": "Reinforce your knowledge by teaching peers",
+        "priority": "Medium"
+    },
+    {
+        "type": "📚 Advanced Topics",
+        "title": "Next Level: Beyond {topic}",
+        "description": "Explore university-level concepts",
+        "priority": "High"
+    }
+)
+
+_AVERAGE_RECS = (
+    {
+        "type": "📝 Practice Set",
+        "title": "{topic} Mixed Practice",
+        "description": "Variety of problems to strengthen skills",
+        "priority": "High"
+    },
+    {
+        "type": "📹 Concept Review",
+        "title": "Video Review of Key Topics",
+        "description": "Refresh your understanding",
+        "priority": "Medium"
+    },
+    {
+        "type": "🎯 Skill Builder",
+        "title": "Targeted Improvement Exercises",
+        "description": "Focus on areas needing work",
+        "priority": "High"
+    },
+    {
+        "type": "⚡ Quick Quiz",
+        "title": "Daily Challenge",
+        "description": "Keep your skills sharp with daily practice",
+        "priority": "Medium"
+    }
+)
+
+_RECOMMENDATION_TEMPLATES = {
+    "Struggling Learner": _STRUGGLING_RECS,
+    "Advanced Learner": _ADVANCED_RECS
+}
+
+def _generate_recommendations(learner_data, current_topic):
+    """Uncached recommendations for the learner's classification and topic"""
+    templates = _RECOMMENDATION_TEMPLATES.get(learner_data['classification'], _AVERAGE_RECS)
+    
+    return [
+        {**rec, "title": rec['title'].format(topic=current_topic), "description": rec['description'].format(topic=current_topic)}
+        for rec in templates
+    ]
+
 def generate_recommendations(learner_data, current_topic):
     """Generate personalized learning recommendations"""
-    classification = learner_data['classification']
-    
-    recommendations = []
-    
-    if classification == "Struggling Learner":
-        recommendations = [
-            {
-                "type": "📹 Video Tutorial",
-                "title": f"Visual Guide to {current_topic} Basics",
-                "description": "Step-by-step visual explanation with examples",
-                "priority": "High"
-            },
-            {
-                "type": "✏️ Guided Practice",
-                "title": "Interactive Practice Problems",
-                "description": "Practice with instant feedback and hints",
-                "priority": "High"
-            },
-            {
-                "type": "📝 Revision Summary",
-                "title": f"{current_topic} Key Concepts Review",
-                "description": "Quick reference sheet with formulas and examples",
-                "priority": "Medium"
-            },
-            {
-                "type": "🎯 Focus Session",
-                "title": "One-on-One Tutoring Recommended",
-                "description": "Personalized help with difficult concepts",
-                "priority": "High"
-            }
-        ]
-    elif classification == "Advanced Learner":
-        recommendations = [
-            {
-                "type": "🏆 Challenge Problem",
-                "title": f"Advanced {current_topic} Competition Problems",
-                "description": "Olympiad-level questions to test your skills",
-                "priority": "High"
-            },
-            {
-                "type": "🔬 Research Project",
-                "title": "Real-World Application Project",
-                "description": "Apply concepts to solve real problems",
-                "priority": "Medium"
-            },
-            {
-                "type": "👥 Peer Teaching",
-                "title": "Help Others Learn",
-                "description": "Reinforce your knowledge by teaching peers",
-                "priority": "Medium"
-            },
-            {
-                "type": "📚 Advanced Topics",
-                "title": f"Next Level: Beyond {current_topic}",
-                "description": "Explore university-level concepts",
-                "priority": "High"
-            }
-        ]
-    else:
-        recommendations = [
-            {
-                "type": "📝 Practice Set",
-                "title": f"{current_topic} Mixed Practice",
-                "description": "Variety of problems to strengthen skills",
-                "priority": "High"
-            },
-            {
-                "type": "📹 Concept Review",
-                "title": "Video Review of Key Topics",
-                "description": "Refresh your understanding",
-                "priority": "Medium"
-            },
-            {
-                "type": "🎯 Skill Builder",
-                "title": "Targeted Improvement Exercises",
-                "description": "Focus on areas needing work",
-                "priority": "High"
-            },
-            {
-                "type": "⚡ Quick Quiz",
-                "title": "Daily Challenge",
-                "description": "Keep your skills sharp with daily practice",
-                "priority": "Medium"
-            }
-        ]
-    
-    return recommendations
+    return _learner_memo(
+        learner_data, 'recommendations',
+        lambda data: _generate_recommendations(data, current_topic),
+        learner_data['classification'], current_topic
+    )
 
 # ==================== VISUALIZATION FUNCTIONS ====================
 
-def create_performance_chart(learner_data):
+# Transparent background and app font shared by every chart
+_COMMON_LAYOUT = dict(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(family="Source Sans 3, sans-serif")
+)
+
+# Chart builders take a QuizHistoryStore and are keyed on its contents. Figures are kept with
+# cache_resource: every session gets the same object instead of an unpickled copy, and
+# st.plotly_chart only reads it, so it is never mutated after it is built
+_STORE_HASH_FUNCS = {QuizHistoryStore: QuizHistoryStore.digest}
+
+def render_cached_plot(fig, key, content_tag):
+    """
+    Draw a cached chart builder's figure with st.plotly_chart.
+    The element key carries a tag of the chart's inputs, so an unchanged chart keeps the same key across reruns
+    """
+    st.plotly_chart(fig, use_container_width=True, key=f"{key}_{content_tag}")
+
+def _store_tag(store):
+    """Short content tag for charts built from a QuizHistoryStore"""
+    return store.digest().hex()[:8]
+
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_performance_chart(store):
     """Create interactive performance over time chart"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history:
+    import plotly.graph_objects as go
+    if not store:
         return None
     
-    df = pd.DataFrame(quiz_history)
-    
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['accuracy'],
+        x=store.dates,
+        y=store.accuracy,
         mode='lines+markers',
         name='Accuracy (%)',
         line=dict(color='#667eea', width=3),
@@ -850,31 +1232,29 @@ def create_performance_chart(learner_data):
     ))
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         title="Performance Trend",
         xaxis_title="Date",
         yaxis_title="Accuracy (%)",
         hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=300
     )
     
     return fig
 
-def create_topic_heatmap(learner_data):
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_topic_heatmap(store):
     """Create heatmap of topic-wise performance"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history:
+    import plotly.graph_objects as go
+    if not store:
         return None
     
-    topic_performance = defaultdict(list)
-    for quiz in quiz_history:
-        topic_performance[quiz['topic']].append(quiz['accuracy'])
-    
-    topics = list(topic_performance.keys())
-    avg_scores = [np.mean(scores) for scores in topic_performance.values()]
+    # Per-topic mean in one pass, topics kept in order of first appearance
+    unique_topics, first_seen, inverse = np.unique(store.topics, return_index=True, return_inverse=True)
+    avg_scores = np.bincount(inverse, weights=store.accuracy) / np.bincount(inverse)
+    order = np.argsort(first_seen)
+    topics = unique_topics[order].tolist()
+    avg_scores = avg_scores[order].tolist()
     
     fig = go.Figure(data=go.Bar(
         x=topics,
@@ -891,19 +1271,37 @@ def create_topic_heatmap(learner_data):
     ))
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         title="Topic-Wise Strengths",
         xaxis_title="Topic",
         yaxis_title="Average Accuracy (%)",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=300
     )
     
     return fig
 
-def create_metrics_gauge(value, title, max_value=100):
-    """Create a gauge chart for metrics"""
+@st.cache_data(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def compute_learner_stats(store, _quiz_history):
+    """Aggregates and history table for the analytics tab, computed once per quiz history (keyed on the store)"""
+    avg_accuracy = float(store.accuracy.mean())
+    avg_time = float(store.avg_time.mean())
+    history_df = pd.DataFrame(_quiz_history, columns=['date', 'topic', 'accuracy', 'avg_time', 'hints_used'])
+    
+    return {
+        'avg_accuracy': avg_accuracy,
+        'avg_time': avg_time,
+        'time_score': max(0, 100 - avg_time),
+        'history_df': history_df.sort_values('date', ascending=False)
+    }
+
+# Gauge bands (lower, middle and upper third of the range) and target line
+_GAUGE_STEP_COLORS = ("#ffecd2", "#fdcb6e", "#84fab0")
+_GAUGE_THRESHOLD_LINE = {'color': "red", 'width': 4}
+
+@st.cache_resource(max_entries=256)
+def _gauge_figure(value, title, max_value):
+    """Build the gauge figure for an already-rounded value"""
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
         value=value,
@@ -912,12 +1310,11 @@ def create_metrics_gauge(value, title, max_value=100):
             'axis': {'range': [0, max_value]},
             'bar': {'color': "#667eea"},
             'steps': [
-                {'range': [0, max_value/3], 'color': "#ffecd2"},
-                {'range': [max_value/3, 2*max_value/3], 'color': "#fdcb6e"},
-                {'range': [2*max_value/3, max_value], 'color': "#84fab0"}
+                {'range': [i * max_value/3, (i + 1) * max_value/3], 'color': color}
+                for i, color in enumerate(_GAUGE_STEP_COLORS)
             ],
             'threshold': {
-                'line': {'color': "red", 'width': 4},
+                'line': _GAUGE_THRESHOLD_LINE,
                 'thickness': 0.75,
                 'value': max_value * 0.9
             }
@@ -925,133 +1322,142 @@ def create_metrics_gauge(value, title, max_value=100):
     ))
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         height=200,
-        margin=dict(l=20, r=20, t=40, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif")
+        margin=dict(l=20, r=20, t=40, b=20)
     )
     
     return fig
 
-def create_time_vs_accuracy_scatter(learner_data):
+def create_metrics_gauge(value, title, max_value=100):
+    """Create a gauge chart for metrics (cached per value rounded to 0.1)"""
+    return _gauge_figure(round(float(value), 1), title, max_value)
+
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_time_vs_accuracy_scatter(store):
     """Create scatter plot of time vs accuracy"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history:
+    import plotly.graph_objects as go
+    if not store:
         return None
     
-    df = pd.DataFrame(quiz_history)
+    # One WebGL trace per topic, in order of first appearance
+    unique_topics, first_seen, inverse = np.unique(store.topics, return_index=True, return_inverse=True)
+    dates = np.asarray(store.dates, dtype=object)
     
-    fig = px.scatter(
-        df, 
-        x='avg_time', 
-        y='accuracy',
-        color='topic',
-        size=[15] * len(df),
-        hover_data=['date'],
-        title='Time vs Accuracy Analysis'
-    )
+    fig = go.Figure()
+    
+    for code in np.argsort(first_seen):
+        mask = inverse == code
+        fig.add_trace(go.Scattergl(
+            x=store.avg_time[mask],
+            y=store.accuracy[mask],
+            mode='markers',
+            name=unique_topics[code],
+            marker=dict(size=15, opacity=0.7),
+            customdata=dates[mask],
+            hovertemplate="Avg time: %{x}s<br>Accuracy: %{y}%<br>Date: %{customdata}"
+        ))
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
+        title='Time vs Accuracy Analysis',
+        legend_title_text='topic',
         xaxis_title="Average Time (seconds)",
         yaxis_title="Accuracy (%)",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=350
     )
     
     return fig
 
-def create_hints_usage_chart(learner_data):
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_hints_usage_chart(store):
     """Create bar chart for hints usage over time"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history:
+    import plotly.graph_objects as go
+    if not store:
         return None
     
-    df = pd.DataFrame(quiz_history)
-    
     fig = go.Figure(data=[
         go.Bar(
-            x=df['date'],
-            y=df['hints_used'],
+            x=store.dates,
+            y=store.hints_used,
             marker=dict(
-                color=df['hints_used'],
+                color=store.hints_used,
                 colorscale='Reds',
                 showscale=True
             ),
-            text=df['hints_used'],
+            text=store.hints_used,
             textposition='auto'
         )
     ])
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         title="Hints Usage Over Time",
         xaxis_title="Date",
         yaxis_title="Hints Used",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=300
     )
     
     return fig
 
-def create_improvement_trajectory(learner_data):
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_improvement_trajectory(store):
     """Create line chart showing improvement trajectory"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history or len(quiz_history) < 2:
+    import plotly.graph_objects as go
+    if len(store) < 2:
         return None
     
-    df = pd.DataFrame(quiz_history)
-    
-    # Calculate moving average
-    df['ma_accuracy'] = df['accuracy'].rolling(window=min(3, len(df)), min_periods=1).mean()
+    # Calculate moving average (window of 3, expanding over the first quizzes) from running sums,
+    # skipping missing accuracies like rolling(min_periods=1) does
+    accuracy = store.accuracy
+    valid = ~np.isnan(accuracy)
+    running_total = np.concatenate(([0.0], np.cumsum(np.where(valid, accuracy, 0.0))))
+    running_count = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(accuracy) + 1)
+    start = np.maximum(end - 3, 0)
+    window_count = running_count[end] - running_count[start]
+    window_total = running_total[end] - running_total[start]
+    ma_accuracy = np.full(len(accuracy), np.nan)
+    np.divide(window_total, window_count, out=ma_accuracy, where=window_count > 0)
     
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['accuracy'],
+        x=store.dates,
+        y=store.accuracy,
         mode='markers',
         name='Actual Score',
         marker=dict(size=8, color='#667eea', opacity=0.6)
     ))
     
     fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['ma_accuracy'],
+        x=store.dates,
+        y=ma_accuracy,
         mode='lines',
         name='Trend',
         line=dict(color='#f093fb', width=3)
     ))
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         title="Learning Progress Trajectory",
         xaxis_title="Date",
         yaxis_title="Accuracy (%)",
         hovermode='x unified',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=350
     )
     
     return fig
 
-def create_performance_distribution(learner_data):
+@st.cache_resource(ttl=600, max_entries=128, hash_funcs=_STORE_HASH_FUNCS)
+def create_performance_distribution(store):
     """Create histogram of performance distribution"""
-    quiz_history = learner_data['quiz_history']
-    
-    if not quiz_history:
+    import plotly.graph_objects as go
+    if not store:
         return None
     
-    accuracies = [q['accuracy'] for q in quiz_history]
-    
     fig = go.Figure(data=[go.Histogram(
-        x=accuracies,
+        x=store.accuracy,
         nbinsx=10,
         marker=dict(
             color='#667eea',
@@ -1060,22 +1466,682 @@ def create_performance_distribution(learner_data):
     )])
     
     fig.update_layout(
+        **_COMMON_LAYOUT,
         title="Score Distribution",
         xaxis_title="Accuracy (%)",
         yaxis_title="Frequency",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family="Source Sans 3, sans-serif"),
         height=300
     )
     
     return fig
 
+# ==================== TAB PANELS ====================
+
+def record_quiz_result(learner_data, quiz):
+    """Score a finished quiz, append it to the learner's history and reclassify them"""
+    answers = np.fromiter(quiz['answers'], dtype=np.int64, count=len(quiz['answers']))
+    correct_answers = int((answers == quiz['correct_arr']).sum())
+    accuracy = (correct_answers / len(quiz['questions'])) * 100
+    avg_time = float(np.asarray(quiz['times'], dtype=np.float64).mean()) if quiz['times'] else 0
+    
+    new_quiz_record = {
+        "accuracy": accuracy,
+        "avg_time": avg_time,
+        "hints_used": quiz['hints_used'],
+        "retries": 0,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "topic": quiz['topic']
+    }
+    _intern_labels(new_quiz_record)
+    
+    get_history_store(learner_data).append(new_quiz_record)
+    learner_data['quiz_history'].append(new_quiz_record)
+    mark_history_changed(learner_data)
+    learner_data['classification'] = classify_learner(learner_data)
+    
+    quiz['correct_answers'] = correct_answers
+    quiz['result'] = new_quiz_record
+
+def _submit_answer(learner_data):
+    """Quiz form callback: score the answer, keep its feedback for the next render and advance the quiz"""
+    quiz = st.session_state.current_quiz
+    q_index = st.session_state.current_question_index
+    question = quiz['questions'][q_index]
+    answer = st.session_state[f"q_{q_index}"]
+    
+    question_time = (datetime.now() - quiz['start_time']).seconds
+    quiz['answers'].append(answer)
+    quiz['times'].append(question_time)
+    
+    feedback_msg, feedback_type = generate_personalized_feedback(
+        question, answer, question['correct'], learner_data['classification']
+    )
+    st.session_state.feedback_messages = [{
+        "message": feedback_msg,
+        "type": feedback_type,
+        "explanation": question['explanation']
+    }]
+    
+    st.session_state.current_question_index += 1
+    quiz['start_time'] = datetime.now()
+    
+    if st.session_state.current_question_index >= len(quiz['questions']):
+        record_quiz_result(learner_data, quiz)
+        quiz['finished'] = True
+
+def _chips(items, css_class, marker):
+    """Render a list of labels as one block of styled chips"""
+    return "".join(f'<div class="{css_class}">{marker} {escape(str(item))}</div>' for item in items)
+
+def _show_feedback(feedback):
+    """Render the feedback kept from the previously answered question"""
+    if feedback['type'] == "success":
+        st.success(feedback['message'])
+    else:
+        st.error(feedback['message'])
+        st.info(f"**Explanation:** {feedback['explanation']}")
+
+@st.fragment
+def _quiz_setup(learner_data):
+    """Topic/difficulty picker for a new quiz, isolated so changing a selection does not rerun the other tabs"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Get available topics
+        if st.session_state.custom_questions_db:
+            available_topics = list(st.session_state.custom_questions_db.keys())
+        else:
+            available_topics = ["Algebra", "Geometry", "Statistics", "Calculus"]
+        
+        topic = st.selectbox("Select Topic", available_topics)
+    
+    with col2:
+        recommended_difficulty = predict_next_difficulty(learner_data)
+        difficulty = st.selectbox(
+            "Select Difficulty",
+            ["easy", "medium", "hard"],
+            index=["easy", "medium", "hard"].index(recommended_difficulty)
+        )
+        
+        st.info(f"💡 AI Recommends: **{recommended_difficulty.title()}** based on your performance")
+    
+    if st.button("🚀 Start Quiz", type="primary", use_container_width=True):
+        questions = get_quiz_questions(topic, difficulty)
+        if questions:
+            st.session_state.current_quiz = {
+                "topic": topic,
+                "difficulty": difficulty,
+                "questions": questions,
+                "correct_arr": np.fromiter((q['correct'] for q in questions), dtype=np.int64, count=len(questions)),
+                "start_time": datetime.now(),
+                "answers": [],
+                "times": [],
+                "hints_used": 0
+            }
+            st.session_state.current_question_index = 0
+            st.session_state.quiz_started = True
+            st.session_state.feedback_messages = []
+            st.rerun()
+        else:
+            st.error("No questions available for this topic/difficulty combination")
+
+@st.fragment
+def _quiz_panel(learner_data):
+    """Active quiz question/feedback loop, rerun on its own so answering does not redraw the page"""
+    quiz = st.session_state.current_quiz
+    q_index = st.session_state.current_question_index
+    
+    if q_index < len(quiz['questions']):
+        question = quiz['questions'][q_index]
+        
+        progress = (q_index) / len(quiz['questions'])
+        st.progress(progress)
+        st.markdown(f"**Question {q_index + 1} of {len(quiz['questions'])}**")
+        
+        st.markdown(f"### {question['question']}")
+        
+        for feedback in st.session_state.feedback_messages:
+            _show_feedback(feedback)
+        
+        with st.form(f"quiz_form_{q_index}"):
+            st.radio(
+                "Select your answer:",
+                range(len(question['options'])),
+                format_func=lambda x: question['options'][x],
+                key=f"q_{q_index}"
+            )
+            st.form_submit_button("✅ Submit Answer", type="primary", on_click=_submit_answer, args=(learner_data,))
+        
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            if st.button("💡 Get Hint", key=f"hint_{q_index}"):
+                st.session_state.current_quiz['hints_used'] += 1
+                st.info(f"**Hint:** {question['hint']}")
+        
+        with col2:
+            if st.button("❌ Exit", key=f"exit_{q_index}"):
+                st.session_state.quiz_started = False
+                st.session_state.current_quiz = None
+                st.rerun()
+    
+    else:
+        if quiz.pop('finished', False):
+            # The last answer changed the learner's history, so refresh the whole page once
+            quiz['celebrate'] = True
+            st.rerun()
+        if quiz.pop('celebrate', False):
+            st.balloons()
+        
+        st.markdown("## 🎉 Quiz Completed!")
+        
+        for feedback in st.session_state.feedback_messages:
+            _show_feedback(feedback)
+        
+        correct_answers = quiz['correct_answers']
+        accuracy = quiz['result']['accuracy']
+        avg_time = quiz['result']['avg_time']
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Score", f"{correct_answers}/{len(quiz['questions'])}")
+        with col2:
+            st.metric("Accuracy", f"{accuracy:.1f}%")
+        with col3:
+            st.metric("Avg Time", f"{avg_time:.1f}s")
+        
+        if accuracy >= 90:
+            st.success("🌟 Outstanding performance! You're mastering this topic!")
+        elif accuracy >= 70:
+            st.success("👍 Good job! Keep practicing to reach mastery.")
+        else:
+            st.warning("💪 Don't worry! Review the material and try again. You've got this!")
+        
+        st.markdown("### 📚 What's Next?")
+        recommendations = generate_recommendations(learner_data, quiz['topic'])
+        
+        for rec in recommendations[:2]:
+            st.markdown(f"""
+                <div class="recommendation-card">
+                    <strong>{rec['type']}</strong><br>
+                    <span style='font-size: 1.1em;'>{rec['title']}</span><br>
+                    <span style='font-size: 0.9em; color: #555;'>{rec['description']}</span>
+                </div>
+            """, unsafe_allow_html=True)
+        
+        if st.button("🔄 Take Another Quiz", type="primary"):
+            st.session_state.quiz_started = False
+            st.session_state.current_quiz = None
+            st.rerun()
+
+
+# Quiz histories up to this many rows are shown as a static table rather than the interactive grid
+_STATIC_TABLE_MAX_ROWS = 50
+
+@st.fragment
+def _analytics_dashboard(learner_data):
+    """Performance analytics tab, isolated so quiz interactions do not rebuild every chart"""
+    st.markdown("## 📊 Comprehensive Performance Analytics")
+    
+    if not learner_data['quiz_history']:
+        st.info("No quiz data available yet. Take a quiz to see your analytics!")
+        return
+    
+    store = get_history_store(learner_data)
+    stats = compute_learner_stats(store, learner_data['quiz_history'])
+    tag = _store_tag(store)
+    
+    st.markdown("### 🎯 Overall Performance")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        fig = create_metrics_gauge(stats['avg_accuracy'], "Average Accuracy")
+        render_cached_plot(fig, "analytics_gauge_accuracy", round(float(stats['avg_accuracy']), 1))
+    
+    with col2:
+        fig = create_metrics_gauge(learner_data['engagement_score'], "Engagement Score")
+        render_cached_plot(fig, "analytics_gauge_engagement", round(float(learner_data['engagement_score']), 1))
+    
+    with col3:
+        fig = create_metrics_gauge(stats['time_score'], "Speed Score")
+        render_cached_plot(fig, "analytics_gauge_speed", round(float(stats['time_score']), 1))
+    
+    st.markdown("---")
+    
+    # Row 1: Accuracy Trend and Topic Performance
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📈 Accuracy Trend")
+        perf_chart = create_performance_chart(store)
+        if perf_chart:
+            render_cached_plot(perf_chart, "analytics_perf_trend", tag)
+    
+    with col2:
+        st.markdown("### 📊 Topic Performance")
+        topic_chart = create_topic_heatmap(store)
+        if topic_chart:
+            render_cached_plot(topic_chart, "analytics_topic_heatmap", tag)
+    
+    st.markdown("---")
+    
+    # Row 2: NEW CHARTS - Time vs Accuracy and Improvement Trajectory
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### ⚡ Time vs Accuracy Analysis")
+        scatter_chart = create_time_vs_accuracy_scatter(store)
+        if scatter_chart:
+            render_cached_plot(scatter_chart, "analytics_scatter", tag)
+    
+    with col2:
+        st.markdown("### 📈 Learning Progress Trajectory")
+        trajectory_chart = create_improvement_trajectory(store)
+        if trajectory_chart:
+            render_cached_plot(trajectory_chart, "analytics_trajectory", tag)
+    
+    st.markdown("---")
+    
+    # Row 3: NEW CHARTS - Hints Usage and Score Distribution
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 💡 Hints Usage Pattern")
+        hints_chart = create_hints_usage_chart(store)
+        if hints_chart:
+            render_cached_plot(hints_chart, "analytics_hints", tag)
+    
+    with col2:
+        st.markdown("### 📊 Score Distribution")
+        dist_chart = create_performance_distribution(store)
+        if dist_chart:
+            render_cached_plot(dist_chart, "analytics_distribution", tag)
+    
+    st.markdown("---")
+    
+    st.markdown("### 📋 Quiz History")
+    history_df = stats['history_df']
+    if len(history_df) <= _STATIC_TABLE_MAX_ROWS:
+        st.table(history_df.style.hide(axis="index").format(precision=1))
+    else:
+        st.dataframe(
+            history_df,
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    st.markdown("### 🤖 ML-Based Learner Clustering")
+    clusters = cluster_learners(st.session_state.learners_data)
+    
+    if clusters:
+        if st.session_state.current_learner in clusters:
+            cluster_id = clusters[st.session_state.current_learner]
+            st.info(f"You are in **Cluster {cluster_id}** based on your performance patterns")
+            
+            similar_learners = [name for name, cid in clusters.items() 
+                              if cid == cluster_id and name != st.session_state.current_learner]
+            
+            if similar_learners:
+                st.write("**Similar learners in your cluster:**")
+                st.write(", ".join(similar_learners))
+
+# Chat messages kept (and redrawn on each run) per session; older turns are dropped
+_MAX_CHAT_MESSAGES = 40
+
+# Tutor chat keywords (matched anywhere in the message, as substrings) and the intent each one signals
+_INTENT_KEYWORDS = {
+    'help': 'help', 'how': 'help',
+    'hint': 'hint', 'clue': 'hint',
+    'strategy': 'strategy', 'study': 'strategy', 'learn': 'strategy',
+    'performance': 'performance', 'progress': 'performance'
+}
+# Intents in the order they win when a message mentions several
+_INTENT_PRIORITY = ('help', 'hint', 'strategy', 'performance')
+# Zero-width lookahead so one scan reports every keyword occurrence, even overlapping ones
+_INTENT_RE = re.compile(r"(?=(%s))" % "|".join(_INTENT_KEYWORDS))
+
+def _detect_intent(message):
+    """Highest-priority intent whose keywords appear in the message, or None"""
+    found = {_INTENT_KEYWORDS[keyword] for keyword in _INTENT_RE.findall(message.lower())}
+    return next((intent for intent in _INTENT_PRIORITY if intent in found), None)
+
+# (focus, strategy) advice per classification; anything else gets the advanced-learner advice
+_CHAT_GUIDANCE = {
+    'Struggling Learner': ('visual explanations and guided practice', 'breaking problems into smaller steps and using visual aids'),
+    'Average Learner': ('consistent practice', 'mixed practice and regular review')
+}
+_DEFAULT_CHAT_GUIDANCE = ('challenging problems and advanced topics', 'tackling advanced problems and teaching others')
+
+def _chat_responses(classification):
+    """Tutor replies for each intent, tailored to a learner classification"""
+    focus, strategy = _CHAT_GUIDANCE.get(classification, _DEFAULT_CHAT_GUIDANCE)
+    return {
+        "help": f"I'm here to help! As a {classification}, I recommend focusing on {focus}.",
+        "hint": "Let me know which question you need help with, and I'll provide a targeted hint without giving away the answer!",
+        "strategy": f"Based on your profile, try {strategy}.",
+        "default": "That's a great question! I'm here to support your learning. Could you be more specific about what you'd like help with?"
+    }
+
+# Replies for the built-in classifications, formatted once; custom labels are formatted on demand
+_RESPONSES_BY_CLASS = {label: _chat_responses(label) for label in _CLASSIFICATION_LABELS}
+
+_STUDY_TIPS = {
+    "Struggling Learner": "Try breaking down complex problems into smaller steps. Visual aids and practice problems with immediate feedback can really help!",
+    "Average Learner": "Mix up your practice with different difficulty levels. Review regularly and don't hesitate to challenge yourself!",
+    "Advanced Learner": "Keep yourself challenged with advanced problems. Consider teaching others to deepen your understanding!"
+}
+
+def _queue_chat_message(role, content):
+    """Queue a chat message produced during this run; _flush_chat_messages records and draws it"""
+    st.session_state._pending_msgs.append({"role": role, "content": content})
+
+def _flush_chat_messages(chat_box):
+    """Move this run's queued messages into the chat history and draw them into the history container"""
+    pending = st.session_state._pending_msgs
+    if not pending:
+        return
+    
+    chat_messages = st.session_state.chat_messages
+    chat_messages.extend(pending)
+    del chat_messages[:-_MAX_CHAT_MESSAGES]
+    
+    with chat_box:
+        for message in pending:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+    pending.clear()
+
+@st.fragment
+def _tutor_chat(learner_data):
+    """AI tutor tab, isolated so chat turns do not rerun the rest of the app"""
+    store = get_history_store(learner_data)
+    
+    st.markdown("## 🤖 AI Tutor Assistant")
+    
+    st.info("💬 Ask me anything about your learning journey! I can help with hints, explanations, and study strategies.")
+    
+    if 'chat_messages' not in st.session_state:
+        st.session_state.chat_messages = []
+    if '_pending_msgs' not in st.session_state:
+        st.session_state._pending_msgs = []
+    
+    # New messages are drawn into this container so they land after the history, above the input
+    chat_box = st.container()
+    with chat_box:
+        for message in st.session_state.chat_messages:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+    
+    user_input = st.chat_input("Type your question here...")
+    
+    if user_input:
+        _queue_chat_message("user", user_input)
+        
+        classification = learner_data['classification']
+        responses = _RESPONSES_BY_CLASS.get(classification) or _chat_responses(classification)
+        
+        response = responses["default"]
+        intent = _detect_intent(user_input)
+        
+        if intent in ("help", "hint", "strategy"):
+            response = responses[intent]
+        elif intent == "performance":
+            if store:
+                avg_acc = store.accuracy.mean()
+                response = f"Your current average accuracy is {avg_acc:.1f}%. {'Great progress!' if avg_acc >= 70 else 'Keep working - improvement takes time!'}"
+        
+        _queue_chat_message("assistant", response)
+    
+    st.markdown("### 🎯 Quick Actions")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("📊 My Progress Summary", use_container_width=True):
+            if store:
+                avg_acc = store.accuracy.mean()
+                summary = f"You've completed {len(store)} quizzes with an average accuracy of {avg_acc:.1f}%. Keep up the great work! 🌟"
+            else:
+                summary = "You haven't taken any quizzes yet. Start your learning journey today! 🚀"
+            
+            _queue_chat_message("assistant", summary)
+    
+    with col2:
+        if st.button("💡 Study Tips", use_container_width=True):
+            tip = _STUDY_TIPS[learner_data['classification']]
+            _queue_chat_message("assistant", tip)
+    
+    with col3:
+        if st.button("🎯 Next Steps", use_container_width=True):
+            adaptations = adapt_content(learner_data)
+            next_steps = f"I recommend trying a **{adaptations['difficulty']}** difficulty quiz next. "
+            
+            if adaptations['revision_needed']:
+                next_steps += "Also, some revision would be beneficial before moving forward."
+            elif adaptations['enable_challenge_mode']:
+                next_steps += "You're ready for challenge mode - let's push your limits!"
+            
+            _queue_chat_message("assistant", next_steps)
+    
+    _flush_chat_messages(chat_box)
+
+# "Why these recommendations" card, filled from adapt_content()
+_ADAPT_TMPL = """
+    <div class="metric-card">
+        <h4>🤖 AI Adaptation Logic</h4>
+        <ul>
+            <li><strong>Recommended Difficulty:</strong> {difficulty}</li>
+            <li><strong>Content Format:</strong> {content_format}</li>
+            <li><strong>Hints Enabled:</strong> {hints}</li>
+            <li><strong>Challenge Mode:</strong> {challenge}</li>
+            <li><strong>Revision Needed:</strong> {revision}</li>
+        </ul>
+    </div>
+"""
+
+@st.fragment
+def _recommendations_panel(learner_data):
+    """Recommendations tab, isolated so its Start / Save buttons do not rerun the other tabs"""
+    st.markdown("## 💡 Personalized Learning Recommendations")
+    
+    latest_topic = learner_data['quiz_history'][-1]['topic'] if learner_data['quiz_history'] else "Algebra"
+    
+    recommendations = generate_recommendations(learner_data, latest_topic)
+    
+    st.markdown(f"### Based on your **{learner_data['classification']}** profile")
+    
+    for i, rec in enumerate(recommendations):
+        with st.expander(f"{rec['type']}: {rec['title']}", expanded=(i < 2)):
+            st.markdown(f"**Description:** {rec['description']}")
+            st.markdown(f"**Priority:** {rec['priority']}")
+            
+            if rec['priority'] == "High":
+                st.markdown("🔥 **Highly Recommended for You**")
+            
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                if st.button("Start", key=f"rec_{i}"):
+                    st.success(f"Starting: {rec['title']}")
+            with col2:
+                if st.button("Save for Later", key=f"save_{i}"):
+                    st.info("Saved to your learning path!")
+    
+    st.markdown("---")
+    st.markdown("### 🎓 Why These Recommendations?")
+    
+    adaptations = adapt_content(learner_data)
+    
+    st.markdown(_ADAPT_TMPL.format_map({
+        'difficulty': adaptations['difficulty'].title(),
+        'content_format': adaptations['content_format'].title(),
+        'hints': 'Yes' if adaptations['provide_hints'] else 'No',
+        'challenge': 'Active' if adaptations['enable_challenge_mode'] else 'Not Active',
+        'revision': 'Yes' if adaptations['revision_needed'] else 'No'
+    }), unsafe_allow_html=True)
+
+# Format guide text above the template downloads, rendered as a single markdown element
+_STATIC_GUIDE_MD = """
+## 📖 Custom Dataset Format Guide
+
+This guide explains how to format your custom datasets for the Smart Learning System.
+
+### 1️⃣ Learner Profiles (CSV Format)
+
+**Required Columns:**
+
+```python
+learner_name,learner_id,engagement_score,learning_pace,classification,strengths,weaknesses
+John Doe,L001,75,moderate,Average Learner,"Problem Solving,Consistency","Time Management,Complex Concepts"
+Jane Smith,L002,92,fast,Advanced Learner,"Quick Learning,Self-Directed","Patience with Basics"
+```
+
+- **learner_name**: Student's full name
+- **learner_id**: Unique identifier (e.g., L001)
+- **engagement_score**: 0-100 score
+- **learning_pace**: slow, moderate, or fast
+- **classification**: Struggling Learner, Average Learner, or Advanced Learner
+- **strengths**: Comma-separated list (in quotes)
+- **weaknesses**: Comma-separated list (in quotes)
+
+### 2️⃣ Quiz History (CSV Format)
+
+**Required Columns:**
+
+```python
+learner_name,accuracy,avg_time,hints_used,retries,date,topic
+John Doe,75.5,45.2,2,0,2026-01-10,Algebra
+John Doe,82.0,38.5,1,0,2026-01-12,Geometry
+Jane Smith,95.0,25.0,0,0,2026-01-10,Algebra
+```
+
+- **learner_name**: Must match name in learner profiles
+- **accuracy**: 0-100 percentage score
+- **avg_time**: Average seconds per question
+- **hints_used**: Number of hints used in quiz
+- **retries**: Number of retry attempts
+- **date**: YYYY-MM-DD format
+- **topic**: Subject area (Algebra, Geometry, etc.)
+
+### 3️⃣ Custom Questions (CSV Format)
+
+**Required Columns:**
+
+```python
+topic,difficulty,question,option1,option2,option3,option4,correct_index,hint,explanation
+Algebra,easy,"What is 2 + 2?",3,4,5,6,1,"Add the numbers","2 + 2 equals 4"
+Geometry,medium,"What is the area of a circle with radius 5?","25π","10π","5π","50π",0,"Use formula A = πr²","A = π × 5² = 25π"
+```
+
+- **topic**: Subject area (can be custom)
+- **difficulty**: easy, medium, or hard
+- **question**: The question text
+- **option1-4**: Four multiple choice options
+- **correct_index**: 0-3 (which option is correct, 0-indexed)
+- **hint**: Helpful hint without giving answer
+- **explanation**: Full explanation of the answer
+
+### 4️⃣ Custom Questions (JSON Format)
+
+**Structure:**
+
+```json
+{
+  "Algebra": {
+    "easy": [
+      {
+        "question": "Solve for x: 2x + 5 = 13",
+        "options": ["x = 3", "x = 4", "x = 5", "x = 6"],
+        "correct": 1,
+        "hint": "Subtract 5 from both sides first",
+        "explanation": "First subtract 5: 2x = 8, then divide: x = 4"
+      }
+    ],
+    "medium": [ ... ],
+    "hard": [ ... ]
+  },
+  "Geometry": { ... }
+}
+```
+"""
+
+# Downloadable CSV templates, kept as bytes so download buttons send them without re-encoding
+_TEMPLATE_LEARNERS_CSV = b"""learner_name,learner_id,engagement_score,learning_pace,classification,strengths,weaknesses
+John Doe,L001,75,moderate,Average Learner,"Problem Solving,Consistency","Time Management"
+Jane Smith,L002,92,fast,Advanced Learner,"Quick Learning","Patience"
+"""
+
+_TEMPLATE_QUIZ_HISTORY_CSV = b"""learner_name,accuracy,avg_time,hints_used,retries,date,topic
+John Doe,75.5,45.2,2,0,2026-01-10,Algebra
+Jane Smith,95.0,25.0,0,0,2026-01-10,Algebra
+"""
+
+_TEMPLATE_QUESTIONS_CSV = b"""topic,difficulty,question,option1,option2,option3,option4,correct_index,hint,explanation
+Algebra,easy,"What is 2 + 2?",3,4,5,6,1,"Add the numbers","2 + 2 equals 4"
+"""
+
+@st.fragment
+def _dataset_guide():
+    """Dataset format guide, isolated so template downloads do not rerun the other tabs"""
+    st.markdown(_STATIC_GUIDE_MD)
+    
+    # Download Templates
+    st.markdown("### 📥 Download Templates")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.download_button(
+            "⬇️ Learners Template",
+            _TEMPLATE_LEARNERS_CSV,
+            file_name="learners_template.csv",
+            mime="text/csv"
+        )
+    
+    with col2:
+        st.download_button(
+            "⬇️ Quiz History Template",
+            _TEMPLATE_QUIZ_HISTORY_CSV,
+            file_name="quiz_history_template.csv",
+            mime="text/csv"
+        )
+    
+    with col3:
+        st.download_button(
+            "⬇️ Questions Template",
+            _TEMPLATE_QUESTIONS_CSV,
+            file_name="questions_template.csv",
+            mime="text/csv"
+        )
+    
+    st.markdown("---")
+    st.markdown("""
+    ### 💡 Tips for Best Results
+    
+    1. **Consistent Naming**: Ensure learner names match exactly across files
+    2. **Date Format**: Always use YYYY-MM-DD format for dates
+    3. **Encoding**: Save CSV files with UTF-8 encoding
+    4. **Quotes**: Use quotes around text with commas (especially strengths/weaknesses)
+    5. **Test Small**: Start with 2-3 rows to test your format
+    6. **Valid Options**: Ensure correct_index is 0-3 for multiple choice
+    7. **Custom Topics**: You can create any topic names you want
+    8. **Parquet**: Learner profiles, quiz history and questions can also be uploaded as .parquet files with the same columns
+    
+    ### 🔧 Troubleshooting
+    
+    - **"Column not found"**: Check spelling of column names
+    - **"Invalid format"**: Ensure CSV is properly formatted
+    - **"No data loaded"**: Check file encoding (use UTF-8)
+    - **Questions not appearing**: Verify topic/difficulty match your selections
+    """)
+
 # ==================== MAIN APPLICATION ====================
 
 def main():
     """Main application logic"""
     
+    _inject_css()
     initialize_session_state()
     
     # Header
@@ -1090,17 +2156,17 @@ def main():
         with st.expander("📤 Upload Custom Data", expanded=False):
             st.markdown("**Upload Learner Profiles:**")
             learner_file = st.file_uploader(
-                "CSV or JSON file",
-                type=['csv', 'json'],
+                "CSV, Parquet or JSON file",
+                type=['csv', 'parquet', 'json'],
                 key='learner_upload',
-                help="CSV: learner_name, learner_id, engagement_score, learning_pace, classification"
+                help="CSV/Parquet: learner_name, learner_id, engagement_score, learning_pace, classification"
             )
             
             if learner_file:
-                if learner_file.name.endswith('.csv'):
-                    custom_learners = load_custom_learners_csv(learner_file)
-                else:
+                if learner_file.name.endswith('.json'):
                     custom_learners = load_custom_learners_json(learner_file)
+                else:
+                    custom_learners = load_custom_learners_csv(learner_file)
                 
                 if custom_learners:
                     if st.button("✅ Use This Data"):
@@ -1111,32 +2177,37 @@ def main():
             st.markdown("---")
             st.markdown("**Upload Quiz History:**")
             quiz_file = st.file_uploader(
-                "CSV file with quiz history",
-                type=['csv'],
+                "CSV or Parquet file with quiz history",
+                type=['csv', 'parquet'],
                 key='quiz_upload',
-                help="CSV: learner_name, accuracy, avg_time, hints_used, retries, date, topic"
+                help="CSV/Parquet: learner_name, accuracy, avg_time, hints_used, retries, date, topic"
             )
             
             if quiz_file:
                 quiz_history = load_quiz_history_csv(quiz_file)
                 if quiz_history:
                     if st.button("✅ Import Quiz History"):
+                        learners_data = st.session_state.learners_data
+                        touched = set()
                         for learner_name, history in quiz_history.items():
-                            if learner_name in st.session_state.learners_data:
-                                st.session_state.learners_data[learner_name]['quiz_history'].extend(history)
-                                # Update classification
-                                st.session_state.learners_data[learner_name]['classification'] = classify_learner(
-                                    st.session_state.learners_data[learner_name]
-                                )
+                            if learner_name in learners_data:
+                                learners_data[learner_name]['quiz_history'].extend(history)
+                                mark_history_changed(learners_data[learner_name])
+                                touched.add(learner_name)
+                        
+                        # Update classifications once all histories are in place
+                        with st.spinner("Reclassifying learners..."):
+                            for learner_name in touched:
+                                learners_data[learner_name]['classification'] = classify_learner(learners_data[learner_name])
                         st.rerun()
             
             st.markdown("---")
             st.markdown("**Upload Custom Questions:**")
             questions_file = st.file_uploader(
-                "JSON or CSV file",
-                type=['json', 'csv'],
+                "JSON, CSV or Parquet file",
+                type=['json', 'csv', 'parquet'],
                 key='questions_upload',
-                help="JSON: {topic: {difficulty: [questions]}} or CSV with columns"
+                help="JSON: {topic: {difficulty: [questions]}} or CSV/Parquet with columns"
             )
             
             if questions_file:
@@ -1148,29 +2219,46 @@ def main():
                 if custom_questions:
                     if st.button("✅ Use Custom Questions"):
                         st.session_state.custom_questions_db = custom_questions
+                        st.session_state.custom_questions_flat = flatten_questions(custom_questions)
                         st.rerun()
         
         # Export Data Section
         with st.expander("📥 Export Data", expanded=False):
             st.markdown("**Export Learner Profiles:**")
-            if st.button("💾 Download Learners CSV"):
-                csv_data = export_learner_data_csv(st.session_state.learners_data)
-                st.download_button(
-                    "⬇️ Download",
-                    csv_data,
-                    file_name="learners_data.csv",
-                    mime="text/csv"
-                )
+            if st.button("💾 Download Learners"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        "⬇️ Parquet",
+                        export_learner_data_parquet(st.session_state.learners_data),
+                        file_name="learners_data.parquet",
+                        mime="application/octet-stream"
+                    )
+                with col2:
+                    st.download_button(
+                        "⬇️ CSV",
+                        export_learner_data_csv(st.session_state.learners_data),
+                        file_name="learners_data.csv",
+                        mime="text/csv"
+                    )
             
             st.markdown("**Export Quiz History:**")
-            if st.button("💾 Download Quiz History CSV"):
-                csv_data = export_quiz_history_csv(st.session_state.learners_data)
-                st.download_button(
-                    "⬇️ Download",
-                    csv_data,
-                    file_name="quiz_history.csv",
-                    mime="text/csv"
-                )
+            if st.button("💾 Download Quiz History"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        "⬇️ Parquet",
+                        export_quiz_history_parquet(st.session_state.learners_data),
+                        file_name="quiz_history.parquet",
+                        mime="application/octet-stream"
+                    )
+                with col2:
+                    st.download_button(
+                        "⬇️ CSV",
+                        export_quiz_history_csv(st.session_state.learners_data),
+                        file_name="quiz_history.csv",
+                        mime="text/csv"
+                    )
         
         st.markdown("---")
         st.markdown("### 👤 Learner Dashboard")
@@ -1228,6 +2316,9 @@ def main():
             if st.session_state.custom_questions_db:
                 st.success("✨ Using Custom Questions")
     
+    # The selected learner's profile, shared by every tab below (None until one is picked)
+    learner_data = st.session_state.learners_data[st.session_state.current_learner] if st.session_state.current_learner else None
+    
     # Main Content Tabs
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📚 Learning Dashboard",
@@ -1240,30 +2331,30 @@ def main():
     
     # TAB 1: Learning Dashboard
     with tab1:
-        if st.session_state.current_learner:
-            learner_data = st.session_state.learners_data[st.session_state.current_learner]
+        if learner_data is not None:
+            store = get_history_store(learner_data)
             
             st.markdown(f"## Welcome, {st.session_state.current_learner}! 👋")
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                if learner_data['quiz_history']:
-                    avg_accuracy = np.mean([q['accuracy'] for q in learner_data['quiz_history']])
+                if store:
+                    avg_accuracy = store.accuracy.mean()
                     st.metric("Average Accuracy", f"{avg_accuracy:.1f}%", f"+{avg_accuracy-50:.1f}%")
                 else:
                     st.metric("Average Accuracy", "N/A")
             
             with col2:
-                total_quizzes = len(learner_data['quiz_history'])
+                total_quizzes = len(store)
                 st.metric("Quizzes Completed", total_quizzes)
             
             with col3:
                 st.metric("Engagement", f"{learner_data['engagement_score']}/100")
             
             with col4:
-                if learner_data['quiz_history']:
-                    total_hints = sum([q['hints_used'] for q in learner_data['quiz_history']])
+                if store:
+                    total_hints = int(store.hints_used.sum())
                     st.metric("Total Hints Used", total_hints)
                 else:
                     st.metric("Total Hints Used", "0")
@@ -1274,590 +2365,68 @@ def main():
             
             with col1:
                 st.markdown("### 💪 Strengths")
-                for strength in learner_data['strengths']:
-                    st.success(f"✓ {strength}")
+                st.markdown(_chips(learner_data['strengths'], 'success-chip', '✓'), unsafe_allow_html=True)
             
             with col2:
                 st.markdown("### 🎯 Areas for Improvement")
-                for weakness in learner_data['weaknesses']:
-                    st.warning(f"→ {weakness}")
+                st.markdown(_chips(learner_data['weaknesses'], 'warning-chip', '→'), unsafe_allow_html=True)
             
             st.markdown("---")
             
             if learner_data['quiz_history']:
                 st.markdown("### 📈 Performance Trends")
+                tag = _store_tag(store)
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    perf_chart = create_performance_chart(learner_data)
+                    perf_chart = create_performance_chart(store)
                     if perf_chart:
-                        st.plotly_chart(perf_chart, use_container_width=True, key="dashboard_perf")
+                        render_cached_plot(perf_chart, "dashboard_perf", tag)
                 
                 with col2:
-                    topic_chart = create_topic_heatmap(learner_data)
+                    topic_chart = create_topic_heatmap(store)
                     if topic_chart:
-                        st.plotly_chart(topic_chart, use_container_width=True, key="dashboard_topic")
+                        render_cached_plot(topic_chart, "dashboard_topic", tag)
         else:
             st.info("👈 Please select a learner profile from the sidebar to begin")
     
     # TAB 2: Take Quiz
     with tab2:
-        if not st.session_state.current_learner:
+        if learner_data is None:
             st.warning("Please select a learner profile first")
         else:
-            learner_data = st.session_state.learners_data[st.session_state.current_learner]
-            
             st.markdown("## 📝 Adaptive Quiz System")
             
             if not st.session_state.quiz_started:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Get available topics
-                    if st.session_state.custom_questions_db:
-                        available_topics = list(st.session_state.custom_questions_db.keys())
-                    else:
-                        available_topics = ["Algebra", "Geometry", "Statistics", "Calculus"]
-                    
-                    topic = st.selectbox("Select Topic", available_topics)
-                
-                with col2:
-                    recommended_difficulty = predict_next_difficulty(learner_data)
-                    difficulty = st.selectbox(
-                        "Select Difficulty",
-                        ["easy", "medium", "hard"],
-                        index=["easy", "medium", "hard"].index(recommended_difficulty)
-                    )
-                    
-                    st.info(f"💡 AI Recommends: **{recommended_difficulty.title()}** based on your performance")
-                
-                if st.button("🚀 Start Quiz", type="primary", use_container_width=True):
-                    questions = get_quiz_questions(topic, difficulty)
-                    if questions:
-                        st.session_state.current_quiz = {
-                            "topic": topic,
-                            "difficulty": difficulty,
-                            "questions": questions,
-                            "start_time": datetime.now(),
-                            "answers": [],
-                            "times": [],
-                            "hints_used": 0
-                        }
-                        st.session_state.current_question_index = 0
-                        st.session_state.quiz_started = True
-                        st.session_state.feedback_messages = []
-                        st.rerun()
-                    else:
-                        st.error("No questions available for this topic/difficulty combination")
-            
+                _quiz_setup(learner_data)
             else:
-                quiz = st.session_state.current_quiz
-                q_index = st.session_state.current_question_index
-                
-                if q_index < len(quiz['questions']):
-                    question = quiz['questions'][q_index]
-                    
-                    progress = (q_index) / len(quiz['questions'])
-                    st.progress(progress)
-                    st.markdown(f"**Question {q_index + 1} of {len(quiz['questions'])}**")
-                    
-                    st.markdown(f"### {question['question']}")
-                    
-                    answer = st.radio(
-                        "Select your answer:",
-                        range(len(question['options'])),
-                        format_func=lambda x: question['options'][x],
-                        key=f"q_{q_index}"
-                    )
-                    
-                    col1, col2, col3 = st.columns([2, 2, 1])
-                    
-                    with col1:
-                        if st.button("💡 Get Hint", key=f"hint_{q_index}"):
-                            st.session_state.current_quiz['hints_used'] += 1
-                            st.info(f"**Hint:** {question['hint']}")
-                    
-                    with col2:
-                        if st.button("✅ Submit Answer", type="primary", key=f"submit_{q_index}"):
-                            question_time = (datetime.now() - quiz['start_time']).seconds
-                            quiz['answers'].append(answer)
-                            quiz['times'].append(question_time)
-                            
-                            is_correct = answer == question['correct']
-                            feedback_msg, feedback_type = generate_personalized_feedback(
-                                question, answer, question['correct'], learner_data['classification']
-                            )
-                            
-                            if is_correct:
-                                st.success(feedback_msg)
-                            else:
-                                st.error(feedback_msg)
-                                st.info(f"**Explanation:** {question['explanation']}")
-                            
-                            st.session_state.current_question_index += 1
-                            quiz['start_time'] = datetime.now()
-                            
-                            if st.session_state.current_question_index >= len(quiz['questions']):
-                                st.balloons()
-                            
-                            st.rerun()
-                    
-                    with col3:
-                        if st.button("❌ Exit", key=f"exit_{q_index}"):
-                            st.session_state.quiz_started = False
-                            st.session_state.current_quiz = None
-                            st.rerun()
-                
-                else:
-                    st.markdown("## 🎉 Quiz Completed!")
-                    
-                    correct_answers = sum([1 for i, ans in enumerate(quiz['answers']) 
-                                          if ans == quiz['questions'][i]['correct']])
-                    accuracy = (correct_answers / len(quiz['questions'])) * 100
-                    avg_time = np.mean(quiz['times']) if quiz['times'] else 0
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("Score", f"{correct_answers}/{len(quiz['questions'])}")
-                    with col2:
-                        st.metric("Accuracy", f"{accuracy:.1f}%")
-                    with col3:
-                        st.metric("Avg Time", f"{avg_time:.1f}s")
-                    
-                    new_quiz_record = {
-                        "accuracy": accuracy,
-                        "avg_time": avg_time,
-                        "hints_used": quiz['hints_used'],
-                        "retries": 0,
-                        "date": datetime.now().strftime("%Y-%m-%d"),
-                        "topic": quiz['topic']
-                    }
-                    
-                    learner_data['quiz_history'].append(new_quiz_record)
-                    learner_data['classification'] = classify_learner(learner_data)
-                    
-                    if accuracy >= 90:
-                        st.success("🌟 Outstanding performance! You're mastering this topic!")
-                    elif accuracy >= 70:
-                        st.success("👍 Good job! Keep practicing to reach mastery.")
-                    else:
-                        st.warning("💪 Don't worry! Review the material and try again. You've got this!")
-                    
-                    st.markdown("### 📚 What's Next?")
-                    recommendations = generate_recommendations(learner_data, quiz['topic'])
-                    
-                    for rec in recommendations[:2]:
-                        st.markdown(f"""
-                            <div class="recommendation-card">
-                                <strong>{rec['type']}</strong><br>
-                                <span style='font-size: 1.1em;'>{rec['title']}</span><br>
-                                <span style='font-size: 0.9em; color: #555;'>{rec['description']}</span>
-                            </div>
-                        """, unsafe_allow_html=True)
-                    
-                    if st.button("🔄 Take Another Quiz", type="primary"):
-                        st.session_state.quiz_started = False
-                        st.session_state.current_quiz = None
-                        st.rerun()
+                _quiz_panel(learner_data)
     
     # TAB 3: Performance Analytics (ENHANCED)
     with tab3:
-        if not st.session_state.current_learner:
+        if learner_data is None:
             st.warning("Please select a learner profile first")
         else:
-            learner_data = st.session_state.learners_data[st.session_state.current_learner]
-            
-            st.markdown("## 📊 Comprehensive Performance Analytics")
-            
-            if not learner_data['quiz_history']:
-                st.info("No quiz data available yet. Take a quiz to see your analytics!")
-            else:
-                st.markdown("### 🎯 Overall Performance")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                avg_accuracy = np.mean([q['accuracy'] for q in learner_data['quiz_history']])
-                avg_time = np.mean([q['avg_time'] for q in learner_data['quiz_history']])
-                
-                with col1:
-                    fig = create_metrics_gauge(avg_accuracy, "Average Accuracy")
-                    st.plotly_chart(fig, use_container_width=True, key="analytics_gauge_accuracy")
-                
-                with col2:
-                    fig = create_metrics_gauge(learner_data['engagement_score'], "Engagement Score")
-                    st.plotly_chart(fig, use_container_width=True, key="analytics_gauge_engagement")
-                
-                with col3:
-                    time_score = max(0, 100 - avg_time)
-                    fig = create_metrics_gauge(time_score, "Speed Score")
-                    st.plotly_chart(fig, use_container_width=True, key="analytics_gauge_speed")
-                
-                st.markdown("---")
-                
-                # Row 1: Accuracy Trend and Topic Performance
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### 📈 Accuracy Trend")
-                    perf_chart = create_performance_chart(learner_data)
-                    if perf_chart:
-                        st.plotly_chart(perf_chart, use_container_width=True, key="analytics_perf_trend")
-                
-                with col2:
-                    st.markdown("### 📊 Topic Performance")
-                    topic_chart = create_topic_heatmap(learner_data)
-                    if topic_chart:
-                        st.plotly_chart(topic_chart, use_container_width=True, key="analytics_topic_heatmap")
-                
-                st.markdown("---")
-                
-                # Row 2: NEW CHARTS - Time vs Accuracy and Improvement Trajectory
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### ⚡ Time vs Accuracy Analysis")
-                    scatter_chart = create_time_vs_accuracy_scatter(learner_data)
-                    if scatter_chart:
-                        st.plotly_chart(scatter_chart, use_container_width=True, key="analytics_scatter")
-                
-                with col2:
-                    st.markdown("### 📈 Learning Progress Trajectory")
-                    trajectory_chart = create_improvement_trajectory(learner_data)
-                    if trajectory_chart:
-                        st.plotly_chart(trajectory_chart, use_container_width=True, key="analytics_trajectory")
-                
-                st.markdown("---")
-                
-                # Row 3: NEW CHARTS - Hints Usage and Score Distribution
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### 💡 Hints Usage Pattern")
-                    hints_chart = create_hints_usage_chart(learner_data)
-                    if hints_chart:
-                        st.plotly_chart(hints_chart, use_container_width=True, key="analytics_hints")
-                
-                with col2:
-                    st.markdown("### 📊 Score Distribution")
-                    dist_chart = create_performance_distribution(learner_data)
-                    if dist_chart:
-                        st.plotly_chart(dist_chart, use_container_width=True, key="analytics_distribution")
-                
-                st.markdown("---")
-                
-                st.markdown("### 📋 Quiz History")
-                df = pd.DataFrame(learner_data['quiz_history'])
-                st.dataframe(
-                    df[['date', 'topic', 'accuracy', 'avg_time', 'hints_used']].sort_values('date', ascending=False),
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                st.markdown("### 🤖 ML-Based Learner Clustering")
-                clusters = cluster_learners(st.session_state.learners_data)
-                
-                if clusters:
-                    if st.session_state.current_learner in clusters:
-                        cluster_id = clusters[st.session_state.current_learner]
-                        st.info(f"You are in **Cluster {cluster_id}** based on your performance patterns")
-                        
-                        similar_learners = [name for name, cid in clusters.items() 
-                                          if cid == cluster_id and name != st.session_state.current_learner]
-                        
-                        if similar_learners:
-                            st.write("**Similar learners in your cluster:**")
-                            st.write(", ".join(similar_learners))
+            _analytics_dashboard(learner_data)
     
     # TAB 4: Recommendations
     with tab4:
-        if not st.session_state.current_learner:
+        if learner_data is None:
             st.warning("Please select a learner profile first")
         else:
-            learner_data = st.session_state.learners_data[st.session_state.current_learner]
-            
-            st.markdown("## 💡 Personalized Learning Recommendations")
-            
-            latest_topic = learner_data['quiz_history'][-1]['topic'] if learner_data['quiz_history'] else "Algebra"
-            
-            recommendations = generate_recommendations(learner_data, latest_topic)
-            
-            st.markdown(f"### Based on your **{learner_data['classification']}** profile")
-            
-            for i, rec in enumerate(recommendations):
-                with st.expander(f"{rec['type']}: {rec['title']}", expanded=(i < 2)):
-                    st.markdown(f"**Description:** {rec['description']}")
-                    st.markdown(f"**Priority:** {rec['priority']}")
-                    
-                    if rec['priority'] == "High":
-                        st.markdown("🔥 **Highly Recommended for You**")
-                    
-                    col1, col2 = st.columns([1, 4])
-                    with col1:
-                        if st.button("Start", key=f"rec_{i}"):
-                            st.success(f"Starting: {rec['title']}")
-                    with col2:
-                        if st.button("Save for Later", key=f"save_{i}"):
-                            st.info("Saved to your learning path!")
-            
-            st.markdown("---")
-            st.markdown("### 🎓 Why These Recommendations?")
-            
-            adaptations = adapt_content(learner_data)
-            
-            st.markdown(f"""
-                <div class="metric-card">
-                    <h4>🤖 AI Adaptation Logic</h4>
-                    <ul>
-                        <li><strong>Recommended Difficulty:</strong> {adaptations['difficulty'].title()}</li>
-                        <li><strong>Content Format:</strong> {adaptations['content_format'].title()}</li>
-                        <li><strong>Hints Enabled:</strong> {'Yes' if adaptations['provide_hints'] else 'No'}</li>
-                        <li><strong>Challenge Mode:</strong> {'Active' if adaptations['enable_challenge_mode'] else 'Not Active'}</li>
-                        <li><strong>Revision Needed:</strong> {'Yes' if adaptations['revision_needed'] else 'No'}</li>
-                    </ul>
-                </div>
-            """, unsafe_allow_html=True)
+            _recommendations_panel(learner_data)
     
     # TAB 5: AI Tutor Chat
     with tab5:
-        if not st.session_state.current_learner:
+        if learner_data is None:
             st.warning("Please select a learner profile first")
         else:
-            learner_data = st.session_state.learners_data[st.session_state.current_learner]
-            
-            st.markdown("## 🤖 AI Tutor Assistant")
-            
-            st.info("💬 Ask me anything about your learning journey! I can help with hints, explanations, and study strategies.")
-            
-            if 'chat_messages' not in st.session_state:
-                st.session_state.chat_messages = []
-            
-            for message in st.session_state.chat_messages:
-                with st.chat_message(message["role"]):
-                    st.markdown(message["content"])
-            
-            user_input = st.chat_input("Type your question here...")
-            
-            if user_input:
-                st.session_state.chat_messages.append({"role": "user", "content": user_input})
-                
-                classification = learner_data['classification']
-                
-                responses = {
-                    "help": f"I'm here to help! As a {classification}, I recommend focusing on {'visual explanations and guided practice' if classification == 'Struggling Learner' else 'consistent practice' if classification == 'Average Learner' else 'challenging problems and advanced topics'}.",
-                    "hint": "Let me know which question you need help with, and I'll provide a targeted hint without giving away the answer!",
-                    "strategy": f"Based on your profile, try {'breaking problems into smaller steps and using visual aids' if classification == 'Struggling Learner' else 'mixed practice and regular review' if classification == 'Average Learner' else 'tackling advanced problems and teaching others'}.",
-                    "default": "That's a great question! I'm here to support your learning. Could you be more specific about what you'd like help with?"
-                }
-                
-                response = responses["default"]
-                user_lower = user_input.lower()
-                
-                if "help" in user_lower or "how" in user_lower:
-                    response = responses["help"]
-                elif "hint" in user_lower or "clue" in user_lower:
-                    response = responses["hint"]
-                elif "strategy" in user_lower or "study" in user_lower or "learn" in user_lower:
-                    response = responses["strategy"]
-                elif "performance" in user_lower or "progress" in user_lower:
-                    if learner_data['quiz_history']:
-                        avg_acc = np.mean([q['accuracy'] for q in learner_data['quiz_history']])
-                        response = f"Your current average accuracy is {avg_acc:.1f}%. {'Great progress!' if avg_acc >= 70 else 'Keep working - improvement takes time!'}"
-                
-                st.session_state.chat_messages.append({"role": "assistant", "content": response})
-                st.rerun()
-            
-            st.markdown("### 🎯 Quick Actions")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if st.button("📊 My Progress Summary", use_container_width=True):
-                    if learner_data['quiz_history']:
-                        avg_acc = np.mean([q['accuracy'] for q in learner_data['quiz_history']])
-                        summary = f"You've completed {len(learner_data['quiz_history'])} quizzes with an average accuracy of {avg_acc:.1f}%. Keep up the great work! 🌟"
-                    else:
-                        summary = "You haven't taken any quizzes yet. Start your learning journey today! 🚀"
-                    
-                    st.session_state.chat_messages.append({"role": "assistant", "content": summary})
-                    st.rerun()
-            
-            with col2:
-                if st.button("💡 Study Tips", use_container_width=True):
-                    tips = {
-                        "Struggling Learner": "Try breaking down complex problems into smaller steps. Visual aids and practice problems with immediate feedback can really help!",
-                        "Average Learner": "Mix up your practice with different difficulty levels. Review regularly and don't hesitate to challenge yourself!",
-                        "Advanced Learner": "Keep yourself challenged with advanced problems. Consider teaching others to deepen your understanding!"
-                    }
-                    tip = tips[learner_data['classification']]
-                    st.session_state.chat_messages.append({"role": "assistant", "content": tip})
-                    st.rerun()
-            
-            with col3:
-                if st.button("🎯 Next Steps", use_container_width=True):
-                    adaptations = adapt_content(learner_data)
-                    next_steps = f"I recommend trying a **{adaptations['difficulty']}** difficulty quiz next. "
-                    
-                    if adaptations['revision_needed']:
-                        next_steps += "Also, some revision would be beneficial before moving forward."
-                    elif adaptations['enable_challenge_mode']:
-                        next_steps += "You're ready for challenge mode - let's push your limits!"
-                    
-                    st.session_state.chat_messages.append({"role": "assistant", "content": next_steps})
-                    st.rerun()
+            _tutor_chat(learner_data)
     
     # TAB 6: Dataset Guide
     with tab6:
-        st.markdown("## 📖 Custom Dataset Format Guide")
-        
-        st.markdown("""
-        This guide explains how to format your custom datasets for the Smart Learning System.
-        """)
-        
-        # Learner Profiles CSV
-        st.markdown("### 1️⃣ Learner Profiles (CSV Format)")
-        
-        st.markdown("**Required Columns:**")
-        st.code("""
-learner_name,learner_id,engagement_score,learning_pace,classification,strengths,weaknesses
-John Doe,L001,75,moderate,Average Learner,"Problem Solving,Consistency","Time Management,Complex Concepts"
-Jane Smith,L002,92,fast,Advanced Learner,"Quick Learning,Self-Directed","Patience with Basics"
-        """)
-        
-        st.markdown("""
-        - **learner_name**: Student's full name
-        - **learner_id**: Unique identifier (e.g., L001)
-        - **engagement_score**: 0-100 score
-        - **learning_pace**: slow, moderate, or fast
-        - **classification**: Struggling Learner, Average Learner, or Advanced Learner
-        - **strengths**: Comma-separated list (in quotes)
-        - **weaknesses**: Comma-separated list (in quotes)
-        """)
-        
-        # Quiz History CSV
-        st.markdown("### 2️⃣ Quiz History (CSV Format)")
-        
-        st.markdown("**Required Columns:**")
-        st.code("""
-learner_name,accuracy,avg_time,hints_used,retries,date,topic
-John Doe,75.5,45.2,2,0,2026-01-10,Algebra
-John Doe,82.0,38.5,1,0,2026-01-12,Geometry
-Jane Smith,95.0,25.0,0,0,2026-01-10,Algebra
-        """)
-        
-        st.markdown("""
-        - **learner_name**: Must match name in learner profiles
-        - **accuracy**: 0-100 percentage score
-        - **avg_time**: Average seconds per question
-        - **hints_used**: Number of hints used in quiz
-        - **retries**: Number of retry attempts
-        - **date**: YYYY-MM-DD format
-        - **topic**: Subject area (Algebra, Geometry, etc.)
-        """)
-        
-        # Custom Questions CSV
-        st.markdown("### 3️⃣ Custom Questions (CSV Format)")
-        
-        st.markdown("**Required Columns:**")
-        st.code("""
-topic,difficulty,question,option1,option2,option3,option4,correct_index,hint,explanation
-Algebra,easy,"What is 2 + 2?",3,4,5,6,1,"Add the numbers","2 + 2 equals 4"
-Geometry,medium,"What is the area of a circle with radius 5?","25π","10π","5π","50π",0,"Use formula A = πr²","A = π × 5² = 25π"
-        """)
-        
-        st.markdown("""
-        - **topic**: Subject area (can be custom)
-        - **difficulty**: easy, medium, or hard
-        - **question**: The question text
-        - **option1-4**: Four multiple choice options
-        - **correct_index**: 0-3 (which option is correct, 0-indexed)
-        - **hint**: Helpful hint without giving answer
-        - **explanation**: Full explanation of the answer
-        """)
-        
-        # Custom Questions JSON
-        st.markdown("### 4️⃣ Custom Questions (JSON Format)")
-        
-        st.markdown("**Structure:**")
-        st.code("""
-{
-  "Algebra": {
-    "easy": [
-      {
-        "question": "Solve for x: 2x + 5 = 13",
-        "options": ["x = 3", "x = 4", "x = 5", "x = 6"],
-        "correct": 1,
-        "hint": "Subtract 5 from both sides first",
-        "explanation": "First subtract 5: 2x = 8, then divide: x = 4"
-      }
-    ],
-    "medium": [ ... ],
-    "hard": [ ... ]
-  },
-  "Geometry": { ... }
-}
-        """, language="json")
-        
-        # Download Templates
-        st.markdown("### 📥 Download Templates")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            template_learners = """learner_name,learner_id,engagement_score,learning_pace,classification,strengths,weaknesses
-John Doe,L001,75,moderate,Average Learner,"Problem Solving,Consistency","Time Management"
-Jane Smith,L002,92,fast,Advanced Learner,"Quick Learning","Patience"
-"""
-            st.download_button(
-                "⬇️ Learners Template",
-                template_learners,
-                file_name="learners_template.csv",
-                mime="text/csv"
-            )
-        
-        with col2:
-            template_quiz = """learner_name,accuracy,avg_time,hints_used,retries,date,topic
-John Doe,75.5,45.2,2,0,2026-01-10,Algebra
-Jane Smith,95.0,25.0,0,0,2026-01-10,Algebra
-"""
-            st.download_button(
-                "⬇️ Quiz History Template",
-                template_quiz,
-                file_name="quiz_history_template.csv",
-                mime="text/csv"
-            )
-        
-        with col3:
-            template_questions = """topic,difficulty,question,option1,option2,option3,option4,correct_index,hint,explanation
-Algebra,easy,"What is 2 + 2?",3,4,5,6,1,"Add the numbers","2 + 2 equals 4"
-"""
-            st.download_button(
-                "⬇️ Questions Template",
-                template_questions,
-                file_name="questions_template.csv",
-                mime="text/csv"
-            )
-        
-        st.markdown("---")
-        st.markdown("""
-        ### 💡 Tips for Best Results
-        
-        1. **Consistent Naming**: Ensure learner names match exactly across files
-        2. **Date Format**: Always use YYYY-MM-DD format for dates
-        3. **Encoding**: Save CSV files with UTF-8 encoding
-        4. **Quotes**: Use quotes around text with commas (especially strengths/weaknesses)
-        5. **Test Small**: Start with 2-3 rows to test your format
-        6. **Valid Options**: Ensure correct_index is 0-3 for multiple choice
-        7. **Custom Topics**: You can create any topic names you want
-        
-        ### 🔧 Troubleshooting
-        
-        - **"Column not found"**: Check spelling of column names
-        - **"Invalid format"**: Ensure CSV is properly formatted
-        - **"No data loaded"**: Check file encoding (use UTF-8)
-        - **Questions not appearing**: Verify topic/difficulty match your selections
-        """)
+        _dataset_guide()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
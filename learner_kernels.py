@@ -0,0 +1,73 @@
+"""
+Numeric kernels for the Smart Learning System, compiled with numba when available.
+
+These live outside Smart_Learning_System.py because Streamlit re-executes the
+main script on every rerun; an imported module keeps its compiled functions
+for the lifetime of the server process.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def classify_kernel(accuracy, avg_time, hints_used):
+    """
+    Classify a learner in a single pass over their quiz arrays.
+    Returns 0 = New, 1 = Struggling, 2 = Average, 3 = Advanced
+    """
+    n = accuracy.shape[0]
+    if n == 0:
+        return 0
+    
+    total_accuracy = 0.0
+    total_time = 0.0
+    total_hints = 0
+    for i in range(n):
+        total_accuracy += accuracy[i]
+        total_time += avg_time[i]
+        total_hints += hints_used[i]
+    
+    avg_accuracy = total_accuracy / n
+    avg_time_taken = total_time / n
+    
+    if avg_accuracy < 60 and (avg_time_taken > 70 or total_hints > 5):
+        return 1
+    elif avg_accuracy >= 85 and avg_time_taken < 35 and total_hints == 0:
+        return 3
+    else:
+        return 2
+
+
+@njit(cache=True)
+def learner_means_kernel(quiz_features, offsets, out):
+    """
+    Per-learner column means of a flattened (n_quizzes, n_features) matrix.
+    Learner i owns rows offsets[i]:offsets[i + 1]; NaN entries are skipped.
+    """
+    n_features = quiz_features.shape[1]
+    for i in range(offsets.shape[0] - 1):
+        for j in range(n_features):
+            total = 0.0
+            count = 0
+            for row in range(offsets[i], offsets[i + 1]):
+                value = quiz_features[row, j]
+                if not np.isnan(value):
+                    total += value
+                    count += 1
+            out[i, j] = total / count if count > 0 else np.nan
+    return out
+
+
+# Compile (or load from numba's on-disk cache) for the store's column dtypes at import,
+# so the first classification or clustering in a session doesn't pay the JIT latency
+classify_kernel(np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64))
+learner_means_kernel(np.empty((0, 2), dtype=np.float64), np.zeros(1, dtype=np.int64), np.empty((0, 2), dtype=np.float64))